@@ -0,0 +1,45 @@
+import threading
+import math
+import time
+import os
+
+# Configuration
+RATE_LIMIT_PER_MINUTE = float(os.getenv("RATE_LIMIT_PER_MINUTE", "30"))  # per client, 0 disables
+RATE_LIMIT_BURST = int(os.getenv("RATE_LIMIT_BURST", "10"))
+RATE_LIMIT_MAX_CLIENTS = 10000  # idle buckets are dropped beyond this many tracked clients
+
+
+class RateLimiter:
+    # Token bucket per client: `burst` requests at once, refilled at `per_minute` tokens a minute
+    def __init__(self, per_minute=RATE_LIMIT_PER_MINUTE, burst=RATE_LIMIT_BURST):
+        self.rate = per_minute / 60.0
+        self.burst = burst
+        self._buckets = {}  # client -> (tokens, last refill time)
+        self._lock = threading.Lock()
+
+    def allow(self, client):
+        # Returns (allowed, seconds until the next request would be allowed)
+        if self.rate <= 0:
+            return True, 0
+        now = time.monotonic()
+        with self._lock:
+            tokens, last = self._buckets.get(client, (self.burst, now))
+            tokens = min(self.burst, tokens + (now - last) * self.rate)
+            if tokens >= 1:
+                self._buckets[client] = (tokens - 1, now)
+                allowed, retry_after = True, 0
+            else:
+                self._buckets[client] = (tokens, now)
+                allowed, retry_after = False, math.ceil((1 - tokens) / self.rate)
+            if len(self._buckets) > RATE_LIMIT_MAX_CLIENTS:
+                self._evict_full(now)
+        return allowed, retry_after
+
+    def _evict_full(self, now):
+        # A bucket that has refilled completely carries no state worth keeping
+        full = [
+            client for client, (tokens, last) in self._buckets.items()
+            if tokens + (now - last) * self.rate >= self.burst
+        ]
+        for client in full:
+            del self._buckets[client]
@@ -0,0 +1,157 @@
+import threading
+import hashlib
+import logging
+import json
+import os
+
+# Configuration
+ANSWER_RULES_PATH = os.getenv("ANSWER_RULES_PATH")  # optional JSON list of extra/overriding rules
+
+# How choice questions are answered, first matching rule wins. A rule matches on any of:
+#   question_id / title_hash  exact question (checked first, O(1)),
+#   list_position             position in the form's question list (1-based),
+#   ordinal_range             [start, stop) over the question's number across all pages (0-based),
+#   title_contains            keywords in the question title,
+# and "choose" is one of: yes, yes_else_no, yes_or_no, random, random_subset, all, or "option:<label>".
+# A rule whose choice is unavailable for the question (no "Yes" option, say) falls through to the next.
+DEFAULT_ANSWER_RULES = [
+    {"name": "sixth_question", "kinds": ["radio"], "list_position": 6, "choose": "yes"},
+    {"name": "previous_funding", "kinds": ["radio"], "title_contains": ["previous funding"], "choose": "yes_else_no"},
+    {"name": "funding_block", "kinds": ["radio"], "ordinal_range": [12, 15], "choose": "yes_else_no"},
+    {"name": "implemented_or_agree", "kinds": ["radio"], "title_contains": ["implemented", "agree"], "choose": "yes"},
+    {"name": "yes_no", "kinds": ["radio"], "choose": "yes_or_no"},
+    {"name": "any_radio", "kinds": ["radio"], "choose": "random"},
+    {"name": "checkbox_subset", "kinds": ["checkbox"], "choose": "random_subset"},
+]
+
+
+def title_hash(title):
+    return hashlib.sha1(title.strip().lower().encode("utf-8")).hexdigest()[:12]
+
+
+def question_key(question):
+    # Stable per-form question identity: the container id, else a hash of the title
+    return question.get("id") or "title:" + title_hash(question.get("title", ""))
+
+
+class Decision:
+    # A compiled answer for one question: the options it may pick from and how
+    def __init__(self, rule, mode, options):
+        self.rule = rule
+        self.mode = mode  # "fixed", "random", "subset" or "all"
+        self.options = options
+
+    def pick(self, rng):
+        # Returns the chosen option labels; only "random"/"subset" draw from rng
+        if self.mode in ("fixed", "all"):
+            return list(self.options)
+        if self.mode == "random":
+            return [rng.choice(self.options)]
+        return rng.sample(self.options, rng.randint(1, len(self.options)))
+
+
+def _resolve(choose, options):
+    lowered = [option.lower() for option in options]
+    yes = next((o for o, low in zip(options, lowered) if "yes" in low), None)
+    no = next((o for o, low in zip(options, lowered) if "yes" not in low and "no" in low), None)
+    if choose == "yes":
+        return ("fixed", [yes]) if yes else None
+    if choose == "yes_else_no":
+        return ("fixed", [yes or no]) if yes or no else ("random", options)
+    if choose == "yes_or_no":
+        return ("random", [yes, no]) if yes and no else None
+    if choose == "random":
+        return ("random", options)
+    if choose == "random_subset":
+        return ("subset", options)
+    if choose == "all":
+        return ("all", options)
+    if choose.startswith("option:"):
+        wanted = choose[len("option:"):].strip().lower()
+        match = [o for o, low in zip(options, lowered) if low == wanted]
+        return ("fixed", match) if match else None
+    raise ValueError(f"Unknown answer choice: {choose}")
+
+
+class AnswerPlan:
+    # Rules are compiled once per question (keyed by question id or title hash, its position on the form
+    # and its options) and the result is reused for every later run, so the fill loop does one dict
+    # lookup per question. Position is part of the key because containers usually have no id, and
+    # two questions sharing a title must not share a position-based decision
+    def __init__(self, rules=None):
+        self.rules = rules or DEFAULT_ANSWER_RULES
+        self._exact = {}
+        for rule in self.rules:
+            for key in filter(None, (rule.get("question_id"), rule.get("title_hash") and "title:" + rule["title_hash"])):
+                self._exact.setdefault(key, []).append(rule)
+        self._decisions = {}
+        self._lock = threading.Lock()
+
+    def decide(self, question, label, kind, options, list_position=None, ordinal=None):
+        key = (question_key(question), list_position, ordinal, kind, tuple(options))
+        decision = self._decisions.get(key)
+        if decision is None:
+            # Keywords match the question title; a choice's own label is just its option text ("Yes")
+            title = (question.get("title") or label).lower()
+            decision = self._compile(question, title, kind, options, list_position, ordinal)
+            with self._lock:
+                self._decisions[key] = decision
+        return decision
+
+    def _compile(self, question, title, kind, options, list_position, ordinal):
+        keys = (question.get("id"), "title:" + title_hash(title))
+        exact = [rule for key in keys if key for rule in self._exact.get(key, [])]
+        candidates = exact + [rule for rule in self.rules if rule not in exact]
+        for rule in candidates:
+            if kind not in rule.get("kinds", [kind]) or not self._matches(rule, keys, title, list_position, ordinal):
+                continue
+            resolved = _resolve(rule["choose"], options)
+            if resolved:
+                return Decision(rule["name"], *resolved)
+        return Decision("fallback", "random", options)
+
+    @staticmethod
+    def _matches(rule, keys, title, list_position, ordinal):
+        if "question_id" in rule and rule["question_id"] != keys[0]:
+            return False
+        if "title_hash" in rule and "title:" + rule["title_hash"] != keys[1]:
+            return False
+        if "list_position" in rule and rule["list_position"] != list_position:
+            return False
+        if "ordinal_range" in rule and (ordinal is None or not rule["ordinal_range"][0] <= ordinal < rule["ordinal_range"][1]):
+            return False
+        if "title_contains" in rule and not any(keyword in title for keyword in rule["title_contains"]):
+            return False
+        return True
+
+
+def load_rules(path=ANSWER_RULES_PATH):
+    # Rules from the file go first, so they can pin exact questions ahead of the defaults; a rule
+    # reusing a default's name replaces it
+    if not path:
+        return list(DEFAULT_ANSWER_RULES)
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            extra = json.load(f)
+    except (OSError, ValueError) as e:
+        logging.warning(f"Ignoring unreadable answer rules {path}: {e}")
+        return list(DEFAULT_ANSWER_RULES)
+    names = {rule["name"] for rule in extra}
+    logging.info(f"Loaded {len(extra)} answer rule(s) from {path}")
+    return extra + [rule for rule in DEFAULT_ANSWER_RULES if rule["name"] not in names]
+
+
+_plans = {}
+_plans_lock = threading.Lock()
+_rules = None
+
+
+def plan_for(form_url):
+    # One compiled plan per form, shared by every run in the process
+    global _rules
+    with _plans_lock:
+        if form_url not in _plans:
+            if _rules is None:
+                _rules = load_rules()
+            _plans[form_url] = AnswerPlan(_rules)
+        return _plans[form_url]
@@ -1,16 +1,142 @@
-from flask import Flask, render_template, request, jsonify
+from flask import Flask, render_template, request, jsonify, send_file
+from werkzeug.middleware.proxy_fix import ProxyFix
+import threading
 import logging
-from seleniumForm2 import run_selenium_with_input  # Import from seleniumForm2.py
+import atexit
+import shutil
+import uuid
+import os
+import hmac
+from functools import wraps
+from urllib.parse import quote
+from seleniumForm2 import DRIVER_PROFILE, DRIVER_PROFILES  # Import from seleniumForm2.py
+from driver_pool import make_pool
+from job_queue import JobQueue, QueueFullError, SUCCEEDED, new_job_id
+from http_engine import run_submission, ENGINES
+from batch import run_batch, missing_field_message, BATCH_WORKERS
+from metrics import registry as metrics_registry
+from admission import RateLimiter
+from data_pools import data_pools
+from log_config import configure_logging
+from result_store import get_result_store, idempotency_key
+
+# Server Configuration
+SERVER_MODE = os.getenv("SERVER_MODE", "development")  # "production" serves through waitress without debug
+SERVER_PORT = int(os.getenv("PORT", "5000"))
+SERVER_THREADS = int(os.getenv("SERVER_THREADS", "16"))
+AUTOMATION_CONCURRENCY = int(os.getenv("AUTOMATION_CONCURRENCY", "4"))  # browser runs at once, across all queues
+SUBMISSIONS_ADMIN_TOKEN = os.getenv("SUBMISSIONS_ADMIN_TOKEN")  # bearer token for /submissions; unset disables it
+TRUST_PROXY = os.getenv("TRUST_PROXY", "0") == "1"  # behind one reverse proxy: take the client address it adds
 
 # Flask Setup
 app = Flask(__name__)
+if TRUST_PROXY:
+    # Only the hop our own proxy appended to X-Forwarded-For is trusted; anything further left is
+    # whatever the client chose to send
+    app.wsgi_app = ProxyFix(app.wsgi_app, x_for=1)
+
+# Logging Setup (shared with the CLIs, see log_config.py)
+configure_logging()
+
+# Browser Pool Setup (one pool per driver profile; sizes and mode come from DRIVER_POOL_* env vars,
+# DRIVER_POOL_MODE=tabs runs every session of a profile as a tab of one shared browser)
+driver_pools = {name: make_pool(profile=name) for name in DRIVER_PROFILES}
+for pool in driver_pools.values():
+    atexit.register(pool.shutdown)
+
+# Job Queue Setup (worker count comes from JOB_WORKERS env var, backlog from JOB_MAX_PENDING)
+# Single submissions and batch records share one cap on concurrent automation runs
+automation_slots = threading.BoundedSemaphore(AUTOMATION_CONCURRENCY)
+
+def run_fill_form_job(user_data, report_progress, result_key=None):
+    # result_key is the result store key the submission was claimed under; it is set by the server,
+    # never read from user_data (batch records carry none)
+    pool = driver_pools[user_data.get('profile') or DRIVER_PROFILE]
+    store = get_result_store() if result_key else None
+    with automation_slots:
+        if store:
+            store.mark_running(result_key)
+        try:
+            success, message = run_submission(user_data, pool=pool, progress=report_progress)
+        except Exception as e:
+            if store:
+                store.finish(result_key, False, f"Server error: {str(e)}")
+            raise
+    if store:
+        store.finish(result_key, success, message)
+    return success, message
+
+def run_single_job(job, report_progress):
+    return run_fill_form_job(job['userData'], report_progress, result_key=job['resultKey'])
+
+job_queue = JobQueue(run_single_job)
+atexit.register(job_queue.shutdown)
+
+# Batch Setup (uploaded files and per-record results live under BATCH_DIR/<batch id>/)
+BATCH_DIR = os.getenv("BATCH_DIR", "batches")
+
+def run_batch_job(batch, report_progress):
+    counts = run_batch(
+        batch['input'],
+        batch['output'],
+        submit=lambda record: run_fill_form_job(record, lambda **progress: None),
+        workers=batch['workers'],
+        progress=report_progress,
+    )
+    return counts['failed'] == 0, f"{counts['succeeded']} succeeded, {counts['failed']} failed."
+
+batch_queue = JobQueue(run_batch_job, workers=int(os.getenv("BATCH_JOBS", "1")))
+atexit.register(batch_queue.shutdown)
 
-# Logging Setup
-logging.basicConfig(
-    level=logging.INFO,
-    format="%(asctime)s - %(levelname)s - %(message)s",
-    handlers=[logging.StreamHandler()],
-)
+# Admission Control (per-client token bucket, sizes come from RATE_LIMIT_* env vars)
+rate_limiter = RateLimiter()
+
+def client_address():
+    return request.remote_addr or 'unknown'
+
+def rejected(status, message, retry_after):
+    response = jsonify({'success': False, 'message': message, 'retryAfter': retry_after})
+    response.status_code = status
+    response.headers['Retry-After'] = str(retry_after)
+    return response
+
+def admission_controlled(view):
+    # 429 when this client is over its rate, 503 when the job backlog is full; both carry Retry-After
+    @wraps(view)
+    def wrapper(*args, **kwargs):
+        allowed, retry_after = rate_limiter.allow(client_address())
+        if not allowed:
+            metrics_registry.inc('http_rejections_total', help_text='Requests refused by admission control', reason='rate_limited')
+            return rejected(429, 'Too many requests, slow down.', retry_after)
+        try:
+            return view(*args, **kwargs)
+        except QueueFullError as e:
+            metrics_registry.inc('http_rejections_total', help_text='Requests refused by admission control', reason='queue_full')
+            logging.warning(f"Rejecting request: {e}")
+            return rejected(503, 'Server is busy, try again later.', e.retry_after)
+    return wrapper
+
+def submission_links(result_key):
+    return {'submissionKey': result_key, 'submissionUrl': f"/submissions/{quote(result_key, safe='')}"}
+
+def duplicate_response(record):
+    # A repeat of a submission that is still in flight or already succeeded: no new automation run
+    metrics_registry.inc('duplicate_submissions_total', help_text='Submissions answered from the result store', status=record['status'])
+    logging.info(f"Duplicate submission {record['key']} ({record['status']}), returning the stored result")
+    body = dict(submission_links(record['key']), duplicate=True, jobId=record['jobId'], status=record['status'])
+    if record['status'] == SUCCEEDED:
+        return jsonify(dict(body, success=True, message=record['message'])), 200
+    body.update(success=True, message='Application already queued.',
+                statusUrl=f"/jobs/{record['jobId']}", resultUrl=f"/jobs/{record['jobId']}/result")
+    return jsonify(body), 202
+
+# Claiming a key and queueing its job happen under one lock, so any in-flight claim made by this
+# process has its job in job_queue. Claims made by other workers sharing the result store (or by an
+# earlier run of this server) are judged by their owner's heartbeat instead, see result_store.py
+claim_lock = threading.Lock()
+
+def job_is_live(record):
+    return job_queue.get(record['jobId']) is not None
 
 # Routes
 @app.route('/')
@@ -18,36 +144,223 @@ def index():
     return render_template('Form.html')  # Serve Form.htlm
 
 @app.route('/fill-form', methods=['POST'])
+@admission_controlled
 def fill_form():
+    store = result_key = job_id = None
     try:
         # Geting user input from form (sent as JSON from Form.html)
         user_data = request.get_json()
         
         # Validate input
-        required_fields = ['fullName', 'email', 'company', 'projectTitle']
-        for field in required_fields:
-            if not user_data.get(field):
-                return jsonify({
-                    'success': False,
-                    'message': f'{field.replace("fullName", "Full Name").replace("projectTitle", "Project Title").title()} is required.'
-                }), 400
+        message = missing_field_message(user_data)
+        if message:
+            return jsonify({'success': False, 'message': message}), 400
+
+        profile = user_data.get('profile')
+        if profile and profile not in DRIVER_PROFILES:
+            return jsonify({
+                'success': False,
+                'message': f'Unknown profile "{profile}". Choose one of: {", ".join(DRIVER_PROFILES)}.'
+            }), 400
+
+        engine = user_data.get('engine')
+        if engine and engine not in ENGINES:
+            return jsonify({
+                'success': False,
+                'message': f'Unknown engine "{engine}". Choose one of: {", ".join(ENGINES)}.'
+            }), 400
 
         # Log received data
         logging.info(f"Received user data: {user_data}")
 
-        # Run Selenium automation with user data
-        success, message = run_selenium_with_input(user_data)
-        
+        # Claim the submission's idempotency key first, so retries and double clicks reuse this run,
+        # then queue Selenium automation with user data and hand back a job ID right away
+        with claim_lock:
+            job_id = new_job_id()
+            store = get_result_store()
+            if store:
+                key = idempotency_key(user_data, request.headers.get('Idempotency-Key'))
+                existing = store.claim(key, user_data, job_id, is_live=job_is_live)
+                if existing:
+                    return duplicate_response(existing)
+                result_key = key
+            job = job_queue.submit({'userData': user_data, 'resultKey': result_key}, job_id=job_id)
+
+        return jsonify(dict({
+            'success': True,
+            'message': 'Application queued.',
+            'jobId': job.id,
+            'statusUrl': f'/jobs/{job.id}',
+            'resultUrl': f'/jobs/{job.id}/result'
+        }, **(submission_links(result_key) if result_key else {}))), 202
+    except QueueFullError:
+        if result_key:
+            store.release(result_key, job_id)
+        raise
+    except Exception as e:
+        logging.error(f"Error processing form submission: {e}")
+        if result_key:
+            store.release(result_key, job_id)
         return jsonify({
-            'success': success,
-            'message': message
+            'success': False,
+            'message': f"Server error: {str(e)}"
+        }), 500
+
+@app.route('/fill-form/batch', methods=['POST'])
+@admission_controlled
+def fill_form_batch():
+    try:
+        # Accept either a multipart upload ("file") or the raw CSV/JSONL request body
+        upload = request.files.get('file')
+        filename = upload.filename if upload else ''
+        is_jsonl = filename.lower().endswith(('.jsonl', '.ndjson', '.json')) or 'json' in (request.content_type or '')
+        if upload and not filename.lower().endswith('.csv') and not is_jsonl:
+            return jsonify({'success': False, 'message': 'Upload a .csv or .jsonl file.'}), 400
+
+        batch_id = uuid.uuid4().hex
+        batch_path = os.path.join(BATCH_DIR, batch_id)
+        os.makedirs(batch_path)
+        input_path = os.path.join(batch_path, 'input.jsonl' if is_jsonl else 'input.csv')
+        if upload:
+            upload.save(input_path)
+        else:
+            with open(input_path, 'wb') as f:
+                f.write(request.get_data())
+
+        workers = min(request.args.get('workers', BATCH_WORKERS, type=int), BATCH_WORKERS)
+        job = batch_queue.submit({
+            'batchId': batch_id,
+            'input': input_path,
+            'output': os.path.join(batch_path, 'results.jsonl'),
+            'workers': max(workers, 1),
         })
+        logging.info(f"Queued batch {batch_id} as job {job.id}")
+
+        return jsonify({
+            'success': True,
+            'message': 'Batch queued.',
+            'batchId': batch_id,
+            'jobId': job.id,
+            'statusUrl': f'/jobs/{job.id}',
+            'resultsUrl': f'/fill-form/batch/{batch_id}/results'
+        }), 202
+    except QueueFullError:
+        shutil.rmtree(batch_path, ignore_errors=True)
+        raise
     except Exception as e:
-        logging.error(f"Error processing form submission: {e}")
+        logging.error(f"Error processing batch submission: {e}")
         return jsonify({
             'success': False,
             'message': f"Server error: {str(e)}"
         }), 500
 
+@app.route('/fill-form/batch/<batch_id>/resume', methods=['POST'])
+@admission_controlled
+def resume_batch(batch_id):
+    # Re-queues an interrupted batch; records already in results.jsonl are skipped
+    batch_path = os.path.join(BATCH_DIR, os.path.basename(batch_id))
+    inputs = [name for name in ('input.csv', 'input.jsonl') if os.path.exists(os.path.join(batch_path, name))]
+    if not inputs:
+        return jsonify({'success': False, 'message': 'Batch not found.'}), 404
+    job = batch_queue.submit({
+        'batchId': batch_id,
+        'input': os.path.join(batch_path, inputs[0]),
+        'output': os.path.join(batch_path, 'results.jsonl'),
+        'workers': BATCH_WORKERS,
+    })
+    return jsonify({'success': True, 'message': 'Batch resumed.', 'batchId': batch_id, 'jobId': job.id,
+                    'statusUrl': f'/jobs/{job.id}'}), 202
+
+@app.route('/fill-form/batch/<batch_id>/results', methods=['GET'])
+def batch_results(batch_id):
+    results_path = os.path.join(BATCH_DIR, os.path.basename(batch_id), 'results.jsonl')
+    if not os.path.exists(results_path):
+        return jsonify({'success': False, 'message': 'No results for this batch yet.'}), 404
+    return send_file(os.path.abspath(results_path), mimetype='application/x-ndjson')
+
+@app.route('/metrics', methods=['GET'])
+def metrics():
+    # Prometheus text format: phase timing histograms, roundtrip and retry counters, pool and backlog gauges
+    for profile, pool in driver_pools.items():
+        stats = pool.stats()
+        for state in ('idle', 'total'):
+            metrics_registry.set('driver_pool_sessions', stats[state], help_text='Browser sessions in the pool',
+                                 profile=profile, mode=stats['mode'], state=state)
+        metrics_registry.set('driver_pool_max_sessions', stats['max'], help_text='Browser session limit of the pool',
+                             profile=profile, mode=stats['mode'])
+    for queue_name, queue in (('single', job_queue), ('batch', batch_queue)):
+        stats = queue.stats()
+        metrics_registry.set('job_queue_pending', stats['pending'], help_text='Jobs waiting for a worker', queue=queue_name)
+        metrics_registry.set('job_queue_max_pending', stats['maxPending'], help_text='Backlog limit before requests get 503', queue=queue_name)
+        metrics_registry.set('job_queue_workers', stats['workers'], help_text='Worker threads of the queue', queue=queue_name)
+        metrics_registry.set('job_queue_retry_after_seconds', queue.retry_after(), help_text='Retry-After a rejected request would get now', queue=queue_name)
+    return app.response_class(metrics_registry.render(), mimetype='text/plain; version=0.0.4')
+
+@app.route('/jobs/<job_id>', methods=['GET'])
+def job_status(job_id):
+    job = job_queue.get(job_id) or batch_queue.get(job_id)
+    if not job:
+        return jsonify({'success': False, 'message': 'Job not found.'}), 404
+    return jsonify(job.to_dict())
+
+@app.route('/submissions', methods=['GET'])
+def submissions():
+    # Past outcomes of one applicant (exact email, required) from the result store, newest first,
+    # optionally narrowed by fullName, status and since; admin only, as it lists personal data
+    store = get_result_store()
+    if not store:
+        return jsonify({'success': False, 'message': 'Result store is disabled.'}), 404
+    if not SUBMISSIONS_ADMIN_TOKEN:
+        return jsonify({'success': False, 'message': 'Submission history is disabled, set SUBMISSIONS_ADMIN_TOKEN.'}), 403
+    token = request.headers.get('Authorization', '').removeprefix('Bearer ').strip()
+    if not hmac.compare_digest(token.encode('utf-8'), SUBMISSIONS_ADMIN_TOKEN.encode('utf-8')):
+        return jsonify({'success': False, 'message': 'Unauthorized.'}), 401
+    email = request.args.get('email')
+    if not email:
+        return jsonify({'success': False, 'message': 'An email filter is required.'}), 400
+    records = store.query(
+        email=email,
+        full_name=request.args.get('fullName'),
+        status=request.args.get('status'),
+        since=request.args.get('since', type=float),
+        limit=request.args.get('limit', 50, type=int),
+    )
+    return jsonify({'success': True, 'submissions': records})
+
+@app.route('/submissions/<path:result_key>', methods=['GET'])
+def submission(result_key):
+    store = get_result_store()
+    record = store.get(result_key) if store else None
+    if not record:
+        return jsonify({'success': False, 'message': 'Submission not found.'}), 404
+    return jsonify(record)
+
+@app.route('/jobs/<job_id>/result', methods=['GET'])
+def job_result(job_id):
+    job = job_queue.get(job_id) or batch_queue.get(job_id)
+    if not job:
+        # Evicted from memory (or from before a restart): the result store still has the outcome
+        store = get_result_store()
+        record = store.by_job(job_id) if store else None
+        if record and record['finishedAt']:
+            return jsonify(record)
+        return jsonify({'success': False, 'message': 'Job not found.'}), 404
+    if not job.done:
+        # Not finished yet, tell the client to keep polling
+        return jsonify(job.to_dict()), 202
+    return jsonify(dict(job.to_dict(), **job.result))
+
 if __name__ == '__main__':
-    app.run(debug=True, host='0.0.0.0', port=5000)
+    data_pools.start()
+    driver_pools[DRIVER_PROFILE].start()
+    if SERVER_MODE == 'production':
+        try:
+            from waitress import serve
+        except ImportError:
+            logging.warning("waitress is not installed, falling back to Flask's threaded server without debug.")
+            app.run(host='0.0.0.0', port=SERVER_PORT, threaded=True)
+        else:
+            logging.info(f"Serving with waitress on port {SERVER_PORT} ({SERVER_THREADS} threads)")
+            serve(app, host='0.0.0.0', port=SERVER_PORT, threads=SERVER_THREADS)
+    else:
+        app.run(debug=True, host='0.0.0.0', port=SERVER_PORT)
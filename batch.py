@@ -0,0 +1,157 @@
+import argparse
+import threading
+import logging
+import json
+import csv
+import os
+from concurrent.futures import ThreadPoolExecutor
+
+# Configuration
+BATCH_WORKERS = int(os.getenv("BATCH_WORKERS", "4"))
+REQUIRED_FIELDS = ['fullName', 'email', 'company', 'projectTitle']
+
+
+def missing_field_message(user_data):
+    for field in REQUIRED_FIELDS:
+        if not user_data.get(field):
+            return f'{field.replace("fullName", "Full Name").replace("projectTitle", "Project Title").title()} is required.'
+    return None
+
+
+def detect_format(path):
+    return "jsonl" if path.lower().endswith((".jsonl", ".ndjson", ".json")) else "csv"
+
+
+class InvalidRecord(ValueError):
+    # Stands in for an input line that is not a JSON object, so it fails on its own index
+    pass
+
+
+def parse_jsonl_record(line):
+    try:
+        record = json.loads(line)
+    except ValueError as e:
+        return InvalidRecord(f"Invalid JSON: {e}")
+    if not isinstance(record, dict):
+        return InvalidRecord(f"Expected a JSON object, got {type(record).__name__}")
+    return record
+
+
+def read_records(path, fmt=None):
+    # Streams (index, record) pairs so huge files never have to fit in memory; a malformed JSONL
+    # line comes through as an InvalidRecord instead of aborting the whole batch
+    fmt = fmt or detect_format(path)
+    with open(path, "r", encoding="utf-8", newline="") as f:
+        if fmt == "csv":
+            for index, row in enumerate(csv.DictReader(f)):
+                yield index, {k: v.strip() for k, v in row.items() if k and v and v.strip()}
+        else:
+            index = 0
+            for line in f:
+                if line.strip():
+                    yield index, parse_jsonl_record(line)
+                    index += 1
+
+
+def completed_indices(output_path):
+    # The output file doubles as the checkpoint: every line written is a finished record
+    done = set()
+    if not os.path.exists(output_path):
+        return done
+    with open(output_path, "r", encoding="utf-8") as f:
+        for line in f:
+            try:
+                done.add(json.loads(line)["index"])
+            except (ValueError, KeyError):
+                continue  # partially written last line from an interrupted run
+    return done
+
+
+def run_batch(input_path, output_path, submit, workers=BATCH_WORKERS, fmt=None, progress=None):
+    done = completed_indices(output_path)
+    if done:
+        logging.info(f"Resuming batch: {len(done)} records already in {output_path}")
+    counts = {"processed": len(done), "succeeded": 0, "failed": 0, "skipped": len(done)}
+    write_lock = threading.Lock()
+    # Bound in-flight records so reading the input never races far ahead of the workers
+    slots = threading.BoundedSemaphore(workers * 2)
+
+    with open(output_path, "a", encoding="utf-8") as out, ThreadPoolExecutor(
+        max_workers=workers, thread_name_prefix="batch"
+    ) as executor:
+
+        def process(index, record):
+            try:
+                if isinstance(record, InvalidRecord):
+                    logging.warning(f"Batch record {index} is malformed: {record}")
+                    success, message = False, str(record)
+                    record = {}
+                else:
+                    message = missing_field_message(record)
+                    if message:
+                        success = False
+                    else:
+                        success, message = submit(record)
+            except Exception as e:
+                logging.error(f"Batch record {index} crashed: {e}", exc_info=True)
+                success, message = False, f"Server error: {str(e)}"
+            finally:
+                slots.release()
+            result = {"index": index, "id": record.get("id"), "success": success, "message": message}
+            with write_lock:
+                out.write(json.dumps(result) + "\n")
+                out.flush()
+                counts["processed"] += 1
+                counts["succeeded" if success else "failed"] += 1
+                if progress:
+                    progress(**counts)
+
+        for index, record in read_records(input_path, fmt):
+            if index in done:
+                continue
+            slots.acquire()
+            executor.submit(process, index, record)
+
+    logging.info(
+        f"Batch finished: {counts['succeeded']} succeeded, {counts['failed']} failed, "
+        f"{counts['skipped']} skipped from a previous run"
+    )
+    return counts
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Submit many applicant records from a CSV or JSONL file.")
+    parser.add_argument("input", help="CSV (with a header row) or JSONL file of applicant records")
+    parser.add_argument("-o", "--output", help="JSONL results file, also used to resume (default: <input>.results.jsonl)")
+    parser.add_argument("-w", "--workers", type=int, default=BATCH_WORKERS, help="parallel submissions")
+    parser.add_argument("--format", choices=["csv", "jsonl"], help="input format (default: from file extension)")
+    parser.add_argument("--profile", help="driver profile for browser submissions (e.g. headless)")
+    parser.add_argument("--engine", help="submission engine: selenium or http")
+    parser.add_argument("--pool-mode", choices=["process", "tabs"], help="a browser per worker, or one shared browser with a tab per worker")
+    args = parser.parse_args(argv)
+
+    from driver_pool import POOL_MODE, make_pool
+    from http_engine import run_submission
+
+    output = args.output or f"{args.input}.results.jsonl"
+    pool = make_pool(args.profile, mode=args.pool_mode or POOL_MODE, min_size=0, max_size=args.workers)
+
+    def submit(record):
+        if args.profile:
+            record.setdefault("profile", args.profile)
+        if args.engine:
+            record.setdefault("engine", args.engine)
+        return run_submission(record, pool=pool)
+
+    try:
+        counts = run_batch(args.input, output, submit, workers=args.workers, fmt=args.format)
+    finally:
+        pool.shutdown()
+    logging.info(f"Results written to {output}")
+    return 0 if counts["failed"] == 0 else 1
+
+
+if __name__ == "__main__":
+    from log_config import configure_logging
+    configure_logging()
+    raise SystemExit(main())
@@ -0,0 +1,263 @@
+import argparse
+import threading
+import statistics
+import logging
+import json
+import time
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+
+from seleniumForm2 import MAX_PAGES, FillContext, automate_form, setup_webdriver
+from form_schema import FormSchema
+
+# Offline benchmark: serves a multi-page stand-in for the live form (same questionItem / questionTitle /
+# nextButton / submitButton structure) on localhost and times automate_form against it.
+
+# Question mix cycled through on every page; titles drive get_field_data just like the real form
+QUESTION_TYPES = [
+    ("Full Name", "text"),
+    ("Email Address", "text"),
+    ("Have you implemented a similar project before?", "radio"),
+    ("Organization Name", "text"),
+    ("Select the focus areas of the project", "checkbox"),
+    ("Project Title", "text"),
+    ("Region", "select"),
+    ("Describe the measurable impact of the project", "textarea"),
+    ("Do you agree to the grant terms?", "radio"),
+    ("Phone Number", "text"),
+]
+CHOICES = {
+    "radio": ["Yes", "No"],
+    "checkbox": ["Education", "Health", "Environment", "Technology"],
+    "select": ["North", "South", "East", "West"],
+}
+
+FIXTURE_TEMPLATE = """<!DOCTYPE html>
+<html lang="en">
+<head><meta charset="utf-8"><title>Benchmark Form</title></head>
+<body>
+<div id="form-root">
+  <div id="question-list"></div>
+  <div id="form-nav"></div>
+</div>
+<script>
+const FORM_PAGES = __PAGES__;
+const startDate = new Date().toISOString();
+const answers = {};
+let pageIndex = 0;
+
+function questionHtml(q) {
+  const title = '<span data-automation-id="questionTitle" id="title-' + q.id + '">' + q.title + '</span>';
+  let body = '';
+  if (q.kind === 'text') {
+    body = '<input type="text" name="' + q.id + '" aria-labelledby="title-' + q.id + '" data-automation-id="textInput">';
+  } else if (q.kind === 'textarea') {
+    body = '<textarea name="' + q.id + '" aria-labelledby="title-' + q.id + '"></textarea>';
+  } else if (q.kind === 'select') {
+    body = '<select name="' + q.id + '" aria-labelledby="title-' + q.id + '"><option value="">Choose</option>' +
+      q.choices.map(c => '<option value="' + c + '">' + c + '</option>').join('') + '</select>';
+  } else {
+    body = q.choices.map((c, i) => {
+      const id = q.id + '-' + i;
+      return '<div class="choice"><input type="' + q.kind + '" name="' + q.id + '" id="' + id + '" value="' + c +
+        '" aria-checked="false" aria-labelledby="' + id + '-label"><label for="' + id + '" id="' + id + '-label">' +
+        c + '</label></div>';
+    }).join('');
+  }
+  return '<div data-automation-id="questionItem" id="question-' + q.id + '">' + title + '<div>' + body + '</div></div>';
+}
+
+function render() {
+  // Replace the containers wholesale so elements from the previous page go stale, like the real form
+  const list = document.getElementById('question-list');
+  const fresh = document.createElement('div');
+  fresh.id = 'question-list';
+  fresh.innerHTML = FORM_PAGES[pageIndex].map(questionHtml).join('');
+  list.replaceWith(fresh);
+  fresh.querySelectorAll('input[type=radio], input[type=checkbox]').forEach(input => {
+    input.addEventListener('change', () => {
+      fresh.querySelectorAll('input[name="' + input.name + '"]').forEach(other => {
+        other.setAttribute('aria-checked', other.checked ? 'true' : 'false');
+      });
+    });
+  });
+  const last = pageIndex === FORM_PAGES.length - 1;
+  document.getElementById('form-nav').innerHTML = last
+    ? '<button type="button" data-automation-id="submitButton">Submit</button>'
+    : '<button type="button" data-automation-id="nextButton">Next</button>';
+  document.querySelector('#form-nav button').addEventListener('click', last ? submit : next);
+}
+
+function collect() {
+  FORM_PAGES[pageIndex].forEach(q => {
+    const inputs = Array.from(document.querySelectorAll('[name="' + q.id + '"]'));
+    const values = inputs.filter(i => (i.type === 'radio' || i.type === 'checkbox') ? i.checked : true)
+      .map(i => i.value).filter(Boolean);
+    answers[q.id] = q.kind === 'checkbox' ? values : (values[0] || '');
+  });
+}
+
+function next() {
+  collect();
+  pageIndex++;
+  setTimeout(render, 20);
+}
+
+function submit() {
+  collect();
+  const payload = Object.keys(answers).map(id => ({questionId: id, answer1: answers[id]}));
+  fetch('/api/response', {
+    method: 'POST',
+    headers: {'Content-Type': 'application/json'},
+    body: JSON.stringify({answers: JSON.stringify(payload), startDate: startDate, submitDate: new Date().toISOString()}),
+  }).then(() => {
+    document.getElementById('form-root').innerHTML = '<div>Your response was submitted.</div>';
+  });
+}
+
+render();
+</script>
+</body>
+</html>
+"""
+
+
+def build_pages(page_count, fields_per_page):
+    pages = []
+    for page in range(page_count):
+        questions = []
+        for index in range(fields_per_page):
+            title, kind = QUESTION_TYPES[(page * fields_per_page + index) % len(QUESTION_TYPES)]
+            question = {"id": f"p{page + 1}q{index + 1}", "title": f"{title} ({page + 1}.{index + 1})", "kind": kind}
+            if kind in CHOICES:
+                question["choices"] = CHOICES[kind]
+            questions.append(question)
+        pages.append(questions)
+    return pages
+
+
+def render_fixture(page_count, fields_per_page):
+    return FIXTURE_TEMPLATE.replace("__PAGES__", json.dumps(build_pages(page_count, fields_per_page)))
+
+
+def start_fixture_server(page_count, fields_per_page):
+    html = render_fixture(page_count, fields_per_page).encode("utf-8")
+    submissions = []
+
+    class FixtureHandler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            self.send_response(200)
+            self.send_header("Content-Type", "text/html; charset=utf-8")
+            self.send_header("Content-Length", str(len(html)))
+            self.end_headers()
+            self.wfile.write(html)
+
+        def do_POST(self):
+            body = self.rfile.read(int(self.headers.get("Content-Length", 0)))
+            submissions.append(body)
+            self.send_response(200)
+            self.send_header("Content-Type", "application/json")
+            self.end_headers()
+            self.wfile.write(b'{"status": "ok"}')
+
+        def log_message(self, format, *args):
+            pass
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), FixtureHandler)
+    server.submissions = submissions
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def percentile(values, pct):
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))]
+
+
+def run_browser_benchmark(url, runs, profile=None, use_schema=False):
+    schema = FormSchema(url) if use_schema else None  # kept in memory only, never written to disk
+    results = []
+    with setup_webdriver(profile) as driver:
+        for run in range(runs):
+            marks = []
+            started = time.perf_counter()
+            started_roundtrips = getattr(driver, "roundtrips", 0)
+            success, message = automate_form(
+                driver,
+                ctx=FillContext(seed=run),
+                progress=lambda **progress: marks.append(time.perf_counter()),
+                schema=schema,
+                form_url=url,
+            )
+            finished = time.perf_counter()
+            marks.append(finished)
+            results.append({
+                "run": run + 1,
+                "success": success,
+                "message": message,
+                "seconds": finished - started,
+                "pageSeconds": [b - a for a, b in zip(marks, marks[1:])],
+                "roundtrips": getattr(driver, "roundtrips", 0) - started_roundtrips,
+            })
+            driver.delete_all_cookies()
+    return results
+
+
+def summarize(results, submissions):
+    run_seconds = [r["seconds"] for r in results]
+    page_seconds = [p for r in results for p in r["pageSeconds"]]
+    total = sum(run_seconds)
+    return {
+        "runs": len(results),
+        "succeeded": sum(1 for r in results if r["success"]),
+        "serverSubmissions": submissions,
+        "runSecondsMedian": statistics.median(run_seconds),
+        "runSecondsP95": percentile(run_seconds, 95),
+        "pageSecondsMean": statistics.mean(page_seconds) if page_seconds else 0.0,
+        "pageSecondsP95": percentile(page_seconds, 95) if page_seconds else 0.0,
+        "roundtripsPerRun": statistics.mean(r["roundtrips"] for r in results),
+        "runsPerMinute": 60 * len(results) / total if total else 0.0,
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark automate_form against a local stand-in form.")
+    parser.add_argument("--pages", type=int, default=3, help=f"pages per form (max {MAX_PAGES})")
+    parser.add_argument("--fields", type=int, default=10, help="questions per page")
+    parser.add_argument("--runs", type=int, default=5, help="form submissions to time")
+    parser.add_argument("--profile", default="headless", help="driver profile (default: headless)")
+    parser.add_argument("--schema-cache", action="store_true", help="record the form schema on run 1 and replay it")
+    parser.add_argument("--json", dest="json_path", help="also write the full results to this JSON file")
+    args = parser.parse_args(argv)
+    if not 1 <= args.pages <= MAX_PAGES:
+        parser.error(f"--pages must be between 1 and {MAX_PAGES}")
+
+    server = start_fixture_server(args.pages, args.fields)
+    # localhost is in FIRST_PARTY_HOSTS, so the headless profile's host-resolver rules still reach the fixture
+    url = f"http://localhost:{server.server_port}/"
+    logging.info(f"Serving {args.pages}-page fixture with {args.fields} questions per page at {url}")
+    try:
+        results = run_browser_benchmark(url, args.runs, profile=args.profile, use_schema=args.schema_cache)
+    finally:
+        server.shutdown()
+
+    summary = summarize(results, len(server.submissions))
+    print(f"{'run':>4} {'ok':>3} {'seconds':>9} {'s/page':>8} {'roundtrips':>11}")
+    for r in results:
+        per_page = statistics.mean(r["pageSeconds"]) if r["pageSeconds"] else 0.0
+        print(f"{r['run']:>4} {'y' if r['success'] else 'n':>3} {r['seconds']:>9.2f} {per_page:>8.2f} {r['roundtrips']:>11}")
+    print(
+        f"\n{summary['succeeded']}/{summary['runs']} succeeded, "
+        f"median {summary['runSecondsMedian']:.2f}s/run (p95 {summary['runSecondsP95']:.2f}s), "
+        f"{summary['pageSecondsMean']:.2f}s/page (p95 {summary['pageSecondsP95']:.2f}s), "
+        f"{summary['roundtripsPerRun']:.0f} roundtrips/run, {summary['runsPerMinute']:.1f} runs/min"
+    )
+    if args.json_path:
+        with open(args.json_path, "w", encoding="utf-8") as f:
+            json.dump({"args": vars(args), "summary": summary, "results": results}, f, indent=2)
+    return 0 if summary["succeeded"] == summary["runs"] else 1
+
+
+if __name__ == "__main__":
+    from log_config import configure_logging
+    configure_logging()
+    raise SystemExit(main())
@@ -0,0 +1,149 @@
+import threading
+import datetime
+import hashlib
+import logging
+import sqlite3
+import json
+import os
+
+# Configuration
+CHECKPOINT_STORE = os.getenv("CHECKPOINT_STORE", "sqlite")  # "sqlite", "files" or "off"
+CHECKPOINT_PATH = os.getenv("CHECKPOINT_PATH", "checkpoints.sqlite3")  # database file for "sqlite"
+CHECKPOINT_DIR = os.getenv("CHECKPOINT_DIR", "checkpoints")  # directory for "files"
+CHECKPOINT_TTL = float(os.getenv("CHECKPOINT_TTL", "3600"))  # seconds; older checkpoints are ignored and dropped
+CHECKPOINT_VERSION = 1
+
+# Fields that identify one applicant's submission, so a re-queued job finds the checkpoint of the first
+IDENTITY_FIELDS = ("fullName", "email", "company", "projectTitle", "seed")
+
+
+def checkpoint_key(user_data, form_url):
+    # An explicit checkpointKey wins; otherwise the same applicant on the same form maps to the same key
+    if user_data.get("checkpointKey"):
+        return str(user_data["checkpointKey"])
+    identity = {field: user_data.get(field) for field in IDENTITY_FIELDS}
+    identity["formUrl"] = form_url
+    return hashlib.sha1(json.dumps(identity, sort_keys=True).encode("utf-8")).hexdigest()
+
+
+def _now():
+    return datetime.datetime.now(datetime.timezone.utc)
+
+
+def is_expired(updated_at, ttl=CHECKPOINT_TTL):
+    # A checkpoint only resumes the run it was written for (a retry or re-queued job), not a submission
+    # from the same applicant much later; a missing or unreadable timestamp counts as expired
+    try:
+        age = _now() - datetime.datetime.fromisoformat(updated_at)
+    except (TypeError, ValueError):
+        return True
+    return age.total_seconds() > ttl
+
+
+class FileCheckpointStore:
+    # One JSON file per run key, written atomically
+    def __init__(self, directory=CHECKPOINT_DIR, ttl=CHECKPOINT_TTL):
+        self.directory = directory
+        self.ttl = ttl
+        self._lock = threading.Lock()
+
+    def _path(self, key):
+        return os.path.join(self.directory, hashlib.sha1(key.encode("utf-8")).hexdigest() + ".json")
+
+    def load(self, key):
+        try:
+            with open(self._path(key), "r", encoding="utf-8") as f:
+                data = json.load(f)
+        except FileNotFoundError:
+            return None
+        except (OSError, ValueError) as e:
+            logging.warning(f"Ignoring unreadable checkpoint for {key}: {e}")
+            return None
+        if data.get("version") != CHECKPOINT_VERSION or data.get("key") != key:
+            return None
+        if is_expired(data.get("updatedAt"), self.ttl):
+            self.delete(key)
+            return None
+        return data
+
+    def save(self, key, checkpoint):
+        path = self._path(key)
+        data = dict(checkpoint, version=CHECKPOINT_VERSION, key=key, updatedAt=_now().isoformat())
+        with self._lock:
+            os.makedirs(self.directory, exist_ok=True)
+            tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump(data, f)
+            os.replace(tmp_path, path)
+
+    def delete(self, key):
+        try:
+            os.remove(self._path(key))
+        except FileNotFoundError:
+            pass
+
+
+class SQLiteCheckpointStore:
+    # One row per run key; a short-lived connection per call keeps it safe across worker threads
+    def __init__(self, path=CHECKPOINT_PATH, ttl=CHECKPOINT_TTL):
+        self.path = path
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        with self._connect() as db:
+            db.execute("PRAGMA journal_mode=WAL")
+            db.execute(
+                "CREATE TABLE IF NOT EXISTS checkpoints ("
+                "key TEXT PRIMARY KEY, version INTEGER NOT NULL, data TEXT NOT NULL, updated_at TEXT NOT NULL)"
+            )
+
+    def _connect(self):
+        return sqlite3.connect(self.path, timeout=30)
+
+    def load(self, key):
+        with self._lock, self._connect() as db:
+            row = db.execute("SELECT version, data, updated_at FROM checkpoints WHERE key = ?", (key,)).fetchone()
+        if not row or row[0] != CHECKPOINT_VERSION:
+            return None
+        if is_expired(row[2], self.ttl):
+            self.delete(key)
+            return None
+        try:
+            return json.loads(row[1])
+        except ValueError as e:
+            logging.warning(f"Ignoring unreadable checkpoint for {key}: {e}")
+            return None
+
+    def save(self, key, checkpoint):
+        updated_at = _now().isoformat()
+        with self._lock, self._connect() as db:
+            db.execute(
+                "INSERT OR REPLACE INTO checkpoints (key, version, data, updated_at) VALUES (?, ?, ?, ?)",
+                (key, CHECKPOINT_VERSION, json.dumps(checkpoint), updated_at),
+            )
+
+    def delete(self, key):
+        with self._lock, self._connect() as db:
+            db.execute("DELETE FROM checkpoints WHERE key = ?", (key,))
+
+
+def make_checkpoint_store(kind=CHECKPOINT_STORE):
+    if kind == "sqlite":
+        return SQLiteCheckpointStore()
+    if kind == "files":
+        return FileCheckpointStore()
+    if kind == "off":
+        return None
+    raise ValueError(f"Unknown checkpoint store: {kind}")
+
+
+_store = None
+_store_lock = threading.Lock()
+
+
+def get_checkpoint_store():
+    # Created on first use so importing this module never touches the disk
+    global _store
+    with _store_lock:
+        if _store is None and CHECKPOINT_STORE != "off":
+            _store = make_checkpoint_store()
+        return _store
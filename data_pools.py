@@ -0,0 +1,122 @@
+import threading
+import argparse
+import logging
+import random
+import json
+import re
+import os
+
+# Configuration
+DATA_POOL_SIZE = int(os.getenv("DATA_POOL_SIZE", "2000"))  # values generated per kind
+DATA_POOL_PATH = os.getenv("DATA_POOL_PATH", "data_pools.json")  # loaded instead of running Faker when present
+DATA_POOL_SEED = int(os.getenv("DATA_POOL_SEED", "0"))
+DATA_POOL_VERSION = 1
+# Only kinds something draws from are generated: names, emails, companies and texts come from the
+# applicant's data or the curated sample lists, dates from FillContext.random_date
+KINDS = ("phones",)
+
+PHONE_EXTENSION = re.compile(r"x\d+")
+PHONE_JUNK = re.compile(r"[^0-9\-]")
+
+
+def normalize_phone(phone):
+    return PHONE_JUNK.sub("", PHONE_EXTENSION.sub("", phone)).strip("-")
+
+
+def generate_pools(size=DATA_POOL_SIZE, seed=DATA_POOL_SEED):
+    # The only place Faker is used; imported here so workers that load a saved pool never pay for it
+    from faker import Faker
+    fake = Faker()
+    fake.seed_instance(seed)
+    return {
+        "phones": [normalize_phone(fake.phone_number()) for _ in range(size)],
+    }
+
+
+class DataPools:
+    # Pre-generated, already-normalized fake values. Pools are built once (in the background, or read
+    # from DATA_POOL_PATH) and never mutated afterwards, so any thread may draw from them without locks.
+    def __init__(self, path=DATA_POOL_PATH, size=DATA_POOL_SIZE, seed=DATA_POOL_SEED):
+        self.path = path
+        self.size = size
+        self.seed = seed
+        self._pools = None
+        self._ready = threading.Event()
+        self._start_lock = threading.Lock()
+        self._started = False
+
+    def start(self):
+        # Loads the saved pools, or starts generating them on a background thread; safe to call repeatedly
+        with self._start_lock:
+            if self._started:
+                return
+            self._started = True
+        if self._load():
+            return
+        threading.Thread(target=self._generate, name="data-pools", daemon=True).start()
+
+    def draw(self, kind, rng=random):
+        # rng is the caller's per-run Random, so seeded runs draw the same values every time
+        if not self._ready.is_set():
+            self.start()
+            self._ready.wait()
+        return rng.choice(self._pools[kind])
+
+    def save(self, path=None):
+        path = path or self.path
+        self._ready.wait()
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump({"version": DATA_POOL_VERSION, "seed": self.seed, "pools": self._pools}, f)
+        os.replace(tmp_path, path)
+        logging.info(f"Saved data pools ({self.size} values per kind) to {path}")
+
+    def _load(self):
+        if not self.path or not os.path.exists(self.path):
+            return False
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+            if data.get("version") != DATA_POOL_VERSION or not set(KINDS) <= set(data["pools"]):
+                raise ValueError("version or kinds mismatch")
+        except (OSError, ValueError, KeyError) as e:
+            logging.warning(f"Ignoring unreadable data pools {self.path}: {e}")
+            return False
+        self._publish({kind: tuple(data["pools"][kind]) for kind in KINDS})
+        logging.info(f"Loaded data pools from {self.path}")
+        return True
+
+    def _generate(self):
+        try:
+            pools = generate_pools(self.size, self.seed)
+        except Exception as e:
+            # Never leave draw() waiting forever: fall back to tiny static pools
+            logging.error(f"Generating data pools failed, using fallback values: {e}", exc_info=True)
+            pools = {"phones": ["555-0100"]}
+        self._publish({kind: tuple(values) for kind, values in pools.items()})
+        logging.info(f"Generated data pools ({self.size} values per kind)")
+
+    def _publish(self, pools):
+        self._pools = pools
+        self._ready.set()
+
+
+data_pools = DataPools()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Pre-generate fake-data pools so workers can skip loading Faker.")
+    parser.add_argument("-o", "--output", default=DATA_POOL_PATH, help=f"pool file to write (default: {DATA_POOL_PATH})")
+    parser.add_argument("-n", "--size", type=int, default=DATA_POOL_SIZE, help="values per kind")
+    parser.add_argument("--seed", type=int, default=DATA_POOL_SEED, help="Faker seed")
+    args = parser.parse_args(argv)
+    pools = DataPools(path=None, size=args.size, seed=args.seed)
+    pools._generate()
+    pools.save(args.output)
+    return 0
+
+
+if __name__ == "__main__":
+    from log_config import configure_logging
+    configure_logging()
+    raise SystemExit(main())
@@ -0,0 +1,361 @@
+from selenium.common.exceptions import InvalidSessionIdException, WebDriverException
+import threading
+import logging
+import socket
+import time
+import os
+from contextlib import contextmanager
+from functools import partial
+
+from seleniumForm2 import block_resources, create_driver
+
+# Configuration
+POOL_MIN_SIZE = int(os.getenv("DRIVER_POOL_MIN_SIZE", "1"))
+POOL_MAX_SIZE = int(os.getenv("DRIVER_POOL_MAX_SIZE", "4"))
+POOL_MAX_JOBS_PER_SESSION = int(os.getenv("DRIVER_POOL_MAX_JOBS", "25"))
+POOL_CHECKOUT_TIMEOUT = float(os.getenv("DRIVER_POOL_CHECKOUT_TIMEOUT", "120"))
+POOL_MODE = os.getenv("DRIVER_POOL_MODE", "process")  # "process" (a browser per session) or "tabs"
+TABS_PER_BROWSER = int(os.getenv("DRIVER_POOL_TABS_PER_BROWSER", "8"))
+TAB_ATTACH_TIMEOUT = 10
+
+
+# Origins of the open page and of everything it loaded, for clearing their storage between jobs
+PAGE_ORIGINS_SCRIPT = """
+try {
+    const origins = [location.origin].concat(performance.getEntriesByType('resource').map(e => new URL(e.name).origin));
+    return Array.from(new Set(origins)).filter(o => o.startsWith('http'));
+} catch (e) { return []; }
+"""
+
+
+class PoolExhaustedError(Exception):
+    pass
+
+
+class PooledSession:
+    def __init__(self, driver):
+        self.driver = driver
+        self.jobs = 0
+
+
+class DriverPool:
+    def __init__(
+        self,
+        min_size=POOL_MIN_SIZE,
+        max_size=POOL_MAX_SIZE,
+        max_jobs_per_session=POOL_MAX_JOBS_PER_SESSION,
+        checkout_timeout=POOL_CHECKOUT_TIMEOUT,
+        profile=None,
+        factory=None,
+    ):
+        if min_size < 0 or max_size < 1 or min_size > max_size:
+            raise ValueError(f"Invalid pool size: min={min_size}, max={max_size}")
+        self.min_size = min_size
+        self.max_size = max_size
+        self.max_jobs_per_session = max_jobs_per_session
+        self.checkout_timeout = checkout_timeout
+        self.profile = profile
+        self.factory = factory or partial(create_driver, profile)
+        self._idle = []
+        self._total = 0
+        self._closed = False
+        self._cond = threading.Condition()
+
+    # Lifecycle
+    def start(self):
+        # Pre-warm up to min_size browsers so the first requests skip cold start
+        while True:
+            with self._cond:
+                if self._closed or self._total >= self.min_size:
+                    return
+                self._total += 1
+            pooled = self._spawn()
+            with self._cond:
+                if pooled:
+                    self._idle.append(pooled)
+                self._cond.notify()
+            if not pooled:
+                return
+
+    def shutdown(self):
+        with self._cond:
+            self._closed = True
+            idle, self._idle = self._idle, []
+            self._cond.notify_all()
+        for pooled in idle:
+            self._discard(pooled)
+
+    def stats(self):
+        with self._cond:
+            return {"idle": len(self._idle), "total": self._total, "max": self.max_size, "mode": "process"}
+
+    # Checkout / Checkin
+    @contextmanager
+    def session(self):
+        pooled = self._checkout()
+        try:
+            yield pooled.driver
+        except InvalidSessionIdException:
+            logging.warning("Pooled session became invalid, recycling it.")
+            self._discard(pooled)
+            raise
+        except BaseException:
+            self._checkin(pooled)
+            raise
+        else:
+            self._checkin(pooled)
+
+    def _checkout(self):
+        deadline = time.monotonic() + self.checkout_timeout
+        while True:
+            with self._cond:
+                while not self._idle and self._total >= self.max_size and not self._closed:
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        raise PoolExhaustedError(
+                            f"No browser session available within {self.checkout_timeout}s"
+                        )
+                    self._cond.wait(remaining)
+                if self._closed:
+                    raise PoolExhaustedError("Driver pool is shut down")
+                if self._idle:
+                    pooled = self._idle.pop()
+                else:
+                    pooled = None
+                    self._total += 1
+
+            if pooled is None:
+                pooled = self._spawn()
+                if pooled is None:
+                    raise PoolExhaustedError("Failed to start a browser session")
+                return pooled
+            if self._is_healthy(pooled):
+                return pooled
+            logging.warning("Pooled session failed health check, replacing it.")
+            self._discard(pooled)
+
+    def _checkin(self, pooled):
+        pooled.jobs += 1
+        if pooled.jobs >= self.max_jobs_per_session:
+            logging.info(f"Recycling browser session after {pooled.jobs} jobs.")
+            self._discard(pooled)
+            return
+        if not self._reset(pooled):
+            self._discard(pooled)
+            return
+        with self._cond:
+            if self._closed:
+                closed = True
+            else:
+                closed = False
+                self._idle.append(pooled)
+                self._cond.notify()
+        if closed:
+            self._discard(pooled)
+
+    # Session Helpers
+    def _spawn(self):
+        try:
+            pooled = PooledSession(self.factory())
+            logging.info("Started pooled browser session.")
+            return pooled
+        except Exception as e:
+            logging.error(f"Failed to start browser session: {e}")
+            with self._cond:
+                self._total -= 1
+                self._cond.notify()
+            return None
+
+    def _discard(self, pooled):
+        try:
+            pooled.driver.quit()
+        except Exception as e:
+            logging.warning(f"Error quitting pooled driver: {e}")
+        with self._cond:
+            self._total -= 1
+            self._cond.notify()
+
+    def _is_healthy(self, pooled):
+        try:
+            return pooled.driver.execute_script("return 1;") == 1
+        except WebDriverException:
+            return False
+
+    def _reset(self, pooled):
+        # Clear cookies and storage for every origin the session touched (login and CDN hosts too, not
+        # just the page left open) so nothing from one applicant's run reaches the next
+        driver = pooled.driver
+        try:
+            handles = driver.window_handles
+            origins = set()
+            for handle in reversed(handles):
+                driver.switch_to.window(handle)
+                origins.update(driver.execute_script(PAGE_ORIGINS_SCRIPT) or [])
+                if handle != handles[0]:
+                    driver.close()
+            driver.get("about:blank")
+            cookies = driver.execute_cdp_cmd("Network.getAllCookies", {})["cookies"]
+            origins.update(
+                f"{scheme}://{cookie['domain'].lstrip('.')}" for cookie in cookies for scheme in ("https", "http")
+            )
+            driver.execute_cdp_cmd("Network.clearBrowserCookies", {})
+            for origin in origins:
+                driver.execute_cdp_cmd("Storage.clearDataForOrigin", {"origin": origin, "storageTypes": "all"})
+            return True
+        except WebDriverException as e:
+            logging.warning(f"Failed to reset pooled session: {e}")
+            return False
+
+
+class BrowserHost:
+    # One Chrome process shared by every tab of a TabPool. Tabs live in separate browser contexts
+    # (incognito-style: own cookies, storage and cache) created over the host session's CDP channel.
+    def __init__(self, profile=None):
+        self.profile = profile
+        self.driver = None
+        self.address = None
+        self._lock = threading.Lock()
+
+    def ensure_started(self):
+        # (Re)launches the browser if it is missing or dead and returns its debugger address
+        with self._lock:
+            if self.driver is not None:
+                try:
+                    self.driver.execute_script("return 1;")
+                    return self.address
+                except WebDriverException:
+                    logging.warning("Shared browser stopped responding, relaunching it.")
+                    self._quit()
+            port = _free_port()
+            self.driver = create_driver(self.profile, remote_debugging_port=port)
+            self.address = f"127.0.0.1:{port}"
+            logging.info(f"Started shared browser at {self.address}.")
+            return self.address
+
+    def open_context(self):
+        # Returns (browser context id, target id of a blank tab inside it)
+        with self._lock:
+            context_id = self.driver.execute_cdp_cmd(
+                "Target.createBrowserContext", {"disposeOnDetach": False}
+            )["browserContextId"]
+            target_id = self.driver.execute_cdp_cmd(
+                "Target.createTarget", {"url": "about:blank", "browserContextId": context_id}
+            )["targetId"]
+        return context_id, target_id
+
+    def close_context(self, context_id):
+        # Disposing the context closes its tabs and drops everything they stored
+        with self._lock:
+            if self.driver is None:
+                return
+            try:
+                self.driver.execute_cdp_cmd("Target.disposeBrowserContext", {"browserContextId": context_id})
+            except WebDriverException as e:
+                logging.warning(f"Failed to dispose browser context {context_id}: {e}")
+
+    def shutdown(self):
+        with self._lock:
+            self._quit()
+
+    def _quit(self):
+        if self.driver is None:
+            return
+        try:
+            self.driver.quit()
+        except Exception as e:
+            logging.warning(f"Error quitting shared browser: {e}")
+        self.driver = None
+        self.address = None
+
+
+class TabPool(DriverPool):
+    # Same checkout/checkin scheduling as DriverPool, but each session is a chromedriver attached to a
+    # tab of one shared browser, so a concurrent submission costs a renderer instead of a whole Chrome
+    def __init__(
+        self,
+        min_size=POOL_MIN_SIZE,
+        max_size=TABS_PER_BROWSER,
+        max_jobs_per_session=POOL_MAX_JOBS_PER_SESSION,
+        checkout_timeout=POOL_CHECKOUT_TIMEOUT,
+        profile=None,
+    ):
+        self.host = BrowserHost(profile)
+        super().__init__(
+            min_size, max_size, max_jobs_per_session, checkout_timeout, profile=profile, factory=self._open_tab
+        )
+
+    def shutdown(self):
+        super().shutdown()
+        self.host.shutdown()
+
+    def stats(self):
+        stats = super().stats()
+        stats["mode"] = "tabs"
+        return stats
+
+    # Tab Helpers
+    def _open_tab(self):
+        address = self.host.ensure_started()
+        context_id, target_id = self.host.open_context()
+        try:
+            driver = create_driver(self.profile, debugger_address=address)
+        except Exception:
+            self.host.close_context(context_id)
+            raise
+        try:
+            self._switch_to_tab(driver, target_id)
+        except Exception:
+            self.host.close_context(context_id)
+            driver.quit()
+            raise
+        driver.browser_context_id = context_id
+        return driver
+
+    def _switch_to_tab(self, driver, target_id):
+        # chromedriver names windows by CDP target id; new targets can take a moment to show up
+        deadline = time.monotonic() + TAB_ATTACH_TIMEOUT
+        while target_id not in driver.window_handles:
+            if time.monotonic() > deadline:
+                raise WebDriverException(f"Tab {target_id} never appeared in the shared browser")
+            time.sleep(0.05)
+        driver.switch_to.window(target_id)
+        block_resources(driver, self.profile)
+
+    def _discard(self, pooled):
+        context_id = getattr(pooled.driver, "browser_context_id", None)
+        if context_id:
+            self.host.close_context(context_id)
+        super()._discard(pooled)  # quitting an attached session leaves the shared browser running
+
+    def _reset(self, pooled):
+        # A fresh browser context is a cleaner slate than clearing cookies and storage in place
+        driver = pooled.driver
+        old_context_id = driver.browser_context_id
+        try:
+            context_id, target_id = self.host.open_context()
+        except WebDriverException as e:
+            logging.warning(f"Failed to open a new browser context: {e}")
+            return False
+        try:
+            self._switch_to_tab(driver, target_id)
+        except WebDriverException as e:
+            logging.warning(f"Failed to move pooled tab to a new context: {e}")
+            self.host.close_context(context_id)
+            return False
+        driver.browser_context_id = context_id
+        self.host.close_context(old_context_id)
+        return True
+
+
+def _free_port():
+    with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def make_pool(profile=None, mode=POOL_MODE, **kwargs):
+    if mode == "tabs":
+        return TabPool(profile=profile, **kwargs)
+    if mode == "process":
+        return DriverPool(profile=profile, **kwargs)
+    raise ValueError(f"Unknown driver pool mode: {mode}")
@@ -0,0 +1,150 @@
+import logging
+import json
+import re
+import os
+from functools import lru_cache
+
+# Configuration
+FIELD_RULES_PATH = os.getenv("FIELD_RULES_PATH")  # optional JSON list of extra/overriding rules
+LABEL_CACHE_SIZE = 4096
+DEFAULT_PRIORITY = 100  # for file rules that set none: after every default rule
+
+# Keys of seleniumForm2.VALUE_GENERATORS, with the rule fields each one needs
+GENERATORS = {
+    "fixed": ("value",),
+    "contact_name": (),
+    "contact_email": (),
+    "contact_phone": (),
+    "company": (),
+    "project_title": (),
+    "date": (),
+    "choice": ("values",),
+    "text": (),
+}
+
+# Keyword -> field type -> value generator. When several rules match a label the lowest priority wins,
+# whatever order the keywords appear in ("organization name" is a name, as it always has been).
+# "generator" names an entry in seleniumForm2.VALUE_GENERATORS; "value" is used by the "fixed" one.
+DEFAULT_FIELD_RULES = [
+    {
+        "name": "measurable_impact",
+        "keywords": ["measurable impact"],
+        "field_type": "long_text",
+        "generator": "fixed",
+        "value": (
+            "This project will generate measurable impact by addressing a clearly defined need within the target "
+            "community. It will implement evidence-based strategies with tracked outcomes using pre- and post-"
+            "assessments, surveys, and key performance indicators. These insights will inform continuous improvement."
+        ),
+        "priority": 10,
+    },
+    {
+        "name": "success_indicators",
+        "keywords": ["success indicator", "key success"],
+        "field_type": "long_text",
+        "generator": "fixed",
+        "value": (
+            "Key success indicators include the number of individuals reached, measurable improvement in outcomes, "
+            "participant satisfaction, and timely delivery of milestones. Stakeholder engagement will also be tracked."
+        ),
+        "priority": 20,
+    },
+    {"name": "name", "keywords": ["name"], "field_type": "name", "generator": "contact_name", "priority": 30},
+    {"name": "email", "keywords": ["email"], "field_type": "email", "generator": "contact_email", "priority": 40},
+    {"name": "phone", "keywords": ["phone"], "field_type": "phone", "generator": "contact_phone", "priority": 50},
+    {
+        "name": "company",
+        "keywords": ["organization", "institution", "company"],
+        "field_type": "company",
+        "generator": "company",
+        "priority": 60,
+    },
+    {
+        "name": "project_title",
+        "keywords": ["project title"],
+        "field_type": "project_title",
+        "generator": "project_title",
+        "priority": 70,
+    },
+    {"name": "date", "keywords": ["date"], "field_type": "date", "generator": "date", "priority": 80},
+]
+FALLBACK_RULE = {"name": "generic", "keywords": [], "field_type": "generic", "generator": "text", "priority": None}
+
+
+class FieldClassifier:
+    # All keywords compile into one alternation scanned with a lookahead, so every (possibly overlapping)
+    # keyword occurrence is found in a single pass over the label regardless of how many rules exist
+    def __init__(self, rules=None):
+        self.rules = sorted(rules or DEFAULT_FIELD_RULES, key=lambda rule: rule["priority"])
+        self._by_keyword = {}
+        for rule in self.rules:
+            for keyword in rule["keywords"]:
+                self._by_keyword.setdefault(keyword.lower(), rule)
+        keywords = sorted(self._by_keyword, key=len, reverse=True)
+        # At any position the regex reports only the longest keyword, so fold in the best rule of
+        # every keyword that is a prefix of it ("date" inside a "date of birth" match)
+        for keyword in keywords:
+            for other in keywords:
+                if keyword != other and keyword.startswith(other):
+                    if self._by_keyword[other]["priority"] < self._by_keyword[keyword]["priority"]:
+                        self._by_keyword[keyword] = self._by_keyword[other]
+        self._pattern = re.compile("(?=(" + "|".join(map(re.escape, keywords)) + "))") if keywords else None
+        self.classify = lru_cache(maxsize=LABEL_CACHE_SIZE)(self._classify)
+
+    def _classify(self, label):
+        best = None
+        if self._pattern:
+            for match in self._pattern.finditer(label.lower()):
+                rule = self._by_keyword[match.group(1)]
+                if best is None or rule["priority"] < best["priority"]:
+                    best = rule
+        return best or FALLBACK_RULE
+
+
+def rule_problem(rule):
+    # Why a (merged) rule cannot be used, or None when it is valid
+    if not isinstance(rule.get("keywords"), list) or not rule["keywords"]:
+        return "needs a non-empty keywords list"
+    if not all(isinstance(keyword, str) and keyword.strip() for keyword in rule["keywords"]):
+        return "keywords must be non-empty strings"
+    if rule.get("generator") not in GENERATORS:
+        return f"unknown generator {rule.get('generator')!r} (known: {', '.join(GENERATORS)})"
+    missing = [field for field in GENERATORS[rule["generator"]] if not rule.get(field)]
+    if missing:
+        return f"generator {rule['generator']!r} needs {', '.join(missing)}"
+    if isinstance(rule["priority"], bool) or not isinstance(rule["priority"], (int, float)):
+        return "priority must be a number"
+    return None
+
+
+def load_rules(path=FIELD_RULES_PATH):
+    # Rules from the file are added to the defaults; a rule reusing a default's name replaces it.
+    # A malformed rule is logged and skipped, it never stops the server from starting
+    rules = {rule["name"]: rule for rule in DEFAULT_FIELD_RULES}
+    if not path:
+        return list(rules.values())
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            extra = json.load(f)
+        if not isinstance(extra, list):
+            raise ValueError("expected a JSON list of rules")
+    except (OSError, ValueError) as e:
+        logging.warning(f"Ignoring unreadable field rules {path}: {e}")
+        return list(rules.values())
+    loaded = 0
+    for index, rule in enumerate(extra):
+        if not isinstance(rule, dict) or not isinstance(rule.get("name"), str) or not rule["name"]:
+            logging.warning(f"Skipping field rule {index} in {path}: needs a name")
+            continue
+        merged = {"field_type": "generic", "priority": DEFAULT_PRIORITY, **rules.get(rule["name"], {}), **rule}
+        problem = rule_problem(merged)
+        if problem:
+            logging.warning(f"Skipping field rule '{rule['name']}' in {path}: {problem}")
+            continue
+        rules[rule["name"]] = merged
+        loaded += 1
+    logging.info(f"Loaded {loaded} of {len(extra)} field rule(s) from {path}")
+    return list(rules.values())
+
+
+classifier = FieldClassifier(load_rules())
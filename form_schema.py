@@ -0,0 +1,87 @@
+import threading
+import hashlib
+import logging
+import json
+import os
+
+# Configuration
+FORM_SCHEMA_DIR = os.getenv("FORM_SCHEMA_DIR", "form_schemas")
+SCHEMA_VERSION = 1
+
+# Field keys that describe the form itself (not one run's state), so they are safe to replay
+STATIC_FIELD_KEYS = (
+    "kind", "tag", "type", "id", "name", "ariaLabel", "ariaLabelledby", "automationId",
+    "label", "choiceLabel", "questionIndex", "questionTitle", "questionListPosition", "selector",
+)
+STATIC_QUESTION_KEYS = ("index", "id", "title", "selector")
+
+_write_lock = threading.Lock()
+
+
+def schema_path(url):
+    return os.path.join(FORM_SCHEMA_DIR, hashlib.sha1(url.encode("utf-8")).hexdigest() + ".json")
+
+
+class FormSchema:
+    def __init__(self, url, pages=None):
+        self.url = url
+        self.pages = pages or {}
+        self.dirty = False
+
+    @classmethod
+    def load(cls, url):
+        path = schema_path(url)
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+        except FileNotFoundError:
+            return cls(url)
+        except (OSError, ValueError) as e:
+            logging.warning(f"Ignoring unreadable form schema {path}: {e}")
+            return cls(url)
+        if data.get("version") != SCHEMA_VERSION or data.get("url") != url:
+            logging.info(f"Discarding form schema {path} (version or URL mismatch)")
+            return cls(url)
+        return cls(url, {int(number): page for number, page in data.get("pages", {}).items()})
+
+    def save(self):
+        if not self.dirty:
+            return
+        path = schema_path(self.url)
+        data = {"version": SCHEMA_VERSION, "url": self.url, "pages": self.pages}
+        with _write_lock:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump(data, f, indent=2)
+            os.replace(tmp_path, path)
+        self.dirty = False
+        logging.info(f"Saved form schema for {self.url} ({len(self.pages)} pages)")
+
+    def page(self, page_number):
+        return self.pages.get(page_number)
+
+    def record_page(self, page_number, snapshot):
+        page = {
+            "fingerprint": snapshot["fingerprint"],
+            "questions": [{key: q[key] for key in STATIC_QUESTION_KEYS} for q in snapshot["questions"]],
+            "fields": [{key: f[key] for key in STATIC_FIELD_KEYS} for f in snapshot["fields"]],
+            "navigation": None,
+        }
+        previous = self.pages.get(page_number)
+        if previous and previous["fingerprint"] == page["fingerprint"]:
+            page["navigation"] = previous.get("navigation")
+        if page != previous:
+            self.pages[page_number] = page
+            self.dirty = True
+
+    def record_navigation(self, page_number, navigation):
+        # navigation is "next" or "submit", whichever button moved the form on from this page
+        page = self.pages.get(page_number)
+        if page and page.get("navigation") != navigation:
+            page["navigation"] = navigation
+            self.dirty = True
+
+    def forget_page(self, page_number):
+        if self.pages.pop(page_number, None) is not None:
+            self.dirty = True
@@ -0,0 +1,369 @@
+# Browser-Side Scripts
+# JavaScript injected with execute_script so each page needs a handful of WebDriver roundtrips
+# instead of one per element lookup.
+
+# DOM helpers shared by every script below
+DOM_HELPERS_SCRIPT = """
+const QUESTION_SELECTOR = 'div[data-automation-id*="questionItem"]';
+const TITLE_SELECTOR = 'span[data-automation-id="questionTitle"]';
+const FIELD_SELECTOR = 'input, textarea, select, div[contenteditable="true"], div[role="combobox"], ' +
+    'div[class*="dropdown"], div[role="radio"], div[role="checkbox"]';
+
+const textOf = node => node ? (node.innerText || node.textContent || '').trim() : '';
+const textOfId = id => id ? textOf(document.getElementById(id)) : '';
+
+function titleOf(el) {
+    const container = el.closest(QUESTION_SELECTOR);
+    return container ? textOf(container.querySelector(TITLE_SELECTOR)) : '';
+}
+
+function isVisible(el) {
+    if (!(el.offsetWidth || el.offsetHeight || el.getClientRects().length)) return false;
+    const style = window.getComputedStyle(el);
+    return style.visibility !== 'hidden' && style.display !== 'none';
+}
+
+function isChoice(el) {
+    const kind = (el.getAttribute('type') || el.getAttribute('role') || '').toLowerCase();
+    return kind === 'radio' || kind === 'checkbox';
+}
+
+// Dynamic state that has to be read fresh on every run
+function stateOf(el) {
+    return {
+        visible: isVisible(el),
+        enabled: !el.disabled && el.getAttribute('aria-disabled') !== 'true',
+        checked: el.getAttribute('aria-checked') === 'true' || (isChoice(el) && !!el.checked),
+        value: el.tagName === 'DIV' ? textOf(el) : (el.value || ''),
+    };
+}
+
+// Selector that survives a reload: anchored on the nearest id, then nth-of-type steps
+function selectorOf(el) {
+    const steps = [];
+    for (let node = el; node && node.nodeType === 1; node = node.parentElement) {
+        if (node.id) {
+            steps.unshift('#' + CSS.escape(node.id));
+            break;
+        }
+        let position = 1;
+        for (let sib = node.previousElementSibling; sib; sib = sib.previousElementSibling) {
+            if (sib.tagName === node.tagName) position++;
+        }
+        steps.unshift(node.tagName.toLowerCase() + ':nth-of-type(' + position + ')');
+    }
+    return steps.join(' > ');
+}
+
+function hashString(str) {
+    let hash = 0x811c9dc5;
+    for (let i = 0; i < str.length; i++) {
+        hash ^= str.charCodeAt(i);
+        hash = Math.imul(hash, 0x01000193) >>> 0;
+    }
+    return hash.toString(16).padStart(8, '0');
+}
+
+// Cheap page identity: question ids, titles and field counts
+function pageFingerprint() {
+    const parts = [];
+    document.querySelectorAll(QUESTION_SELECTOR).forEach(container => {
+        parts.push(container.id + '|' + textOf(container.querySelector(TITLE_SELECTOR)) + '|' +
+            container.querySelectorAll(FIELD_SELECTOR).length);
+    });
+    return parts.length ? hashString(parts.join('\\n')) : '';
+}
+"""
+
+# Label helpers shared by field discovery and bulk label resolution
+LABEL_HELPERS_SCRIPT = DOM_HELPERS_SCRIPT + """
+// Label cascade: aria-labelledby, label[for], question title, aria-label, then the radio's own choice text
+function labelOf(el, titleText) {
+    const labelledby = el.getAttribute('aria-labelledby');
+    let text = labelledby ? textOfId(labelledby.split(/\\s+/)[0]) : '';
+    if (text) return text;
+    if (el.id) {
+        text = textOf(document.querySelector('label[for="' + CSS.escape(el.id) + '"]'));
+        if (text) return text;
+    }
+    if (titleText) return titleText;
+    text = (el.getAttribute('aria-label') || '').trim();
+    if (text) return text;
+    if ((el.getAttribute('type') || el.getAttribute('role')) === 'radio') {
+        text = choiceLabelOf(el);
+        if (text) return 'Radio Option: ' + text;
+    }
+    return '';
+}
+
+function choiceLabelOf(el) {
+    const labelledby = el.getAttribute('aria-labelledby');
+    let text = labelledby ? textOfId(labelledby.split(/\\s+/)[0]) : '';
+    if (text) return text;
+    text = textOf(el.closest('label'));
+    if (text) return text;
+    for (let sib = el.nextElementSibling; sib; sib = sib.nextElementSibling) {
+        text = textOf(sib);
+        if (text) return text;
+    }
+    return (el.getAttribute('aria-label') || '').trim();
+}
+"""
+
+# Resolves labels for a batch of elements (arguments[0]) in a single roundtrip
+LABEL_RESOLUTION_SCRIPT = LABEL_HELPERS_SCRIPT + """
+return arguments[0].map(el => labelOf(el, titleOf(el)));
+"""
+
+# Walks every questionItem container once and returns a snapshot of its fields, so the fill loop
+# works from plain data instead of paying a WebDriver roundtrip per is_displayed/get_attribute call.
+FIELD_DISCOVERY_SCRIPT = LABEL_HELPERS_SCRIPT + """
+const questionList = document.getElementById('question-list');
+
+function kindOf(el) {
+    const tag = el.tagName.toLowerCase();
+    const type = (el.getAttribute('type') || '').toLowerCase();
+    const role = el.getAttribute('role');
+    if (tag === 'input') {
+        if (['hidden', 'submit', 'button'].includes(type)) return null;
+        if (type === 'radio') return 'radio';
+        if (type === 'checkbox') return 'checkbox';
+        if (type === 'date' || type === 'datetime-local' || (el.getAttribute('aria-label') || '').includes('Date')) return 'date';
+        return 'text';
+    }
+    if (tag === 'textarea') return 'text';
+    if (tag === 'select') return 'dropdown';
+    if (role === 'radio') return 'radio';
+    if (role === 'checkbox') return 'checkbox';
+    if (role === 'combobox' || String(el.className).includes('dropdown')) return 'dropdown';
+    if (el.getAttribute('contenteditable') === 'true') return 'text';
+    return null;
+}
+
+function listPositionOf(container) {
+    if (!questionList) return null;
+    let node = container;
+    while (node && node.parentElement !== questionList) node = node.parentElement;
+    if (!node) return null;
+    let position = 0;
+    for (const child of questionList.children) {
+        if (child.tagName === 'DIV') position++;
+        if (child === node) return position;
+    }
+    return null;
+}
+
+const seen = new Set();
+const questions = [];
+const fields = [];
+document.querySelectorAll(QUESTION_SELECTOR).forEach((container, index) => {
+    const titleText = textOf(container.querySelector(TITLE_SELECTOR));
+    const listPosition = listPositionOf(container);
+    questions.push({
+        element: container,
+        index: index,
+        id: container.id || '',
+        title: titleText,
+        selector: selectorOf(container),
+    });
+    container.querySelectorAll(FIELD_SELECTOR).forEach(el => {
+        if (seen.has(el)) return;
+        seen.add(el);
+        const kind = kindOf(el);
+        if (!kind) return;
+        const choice = kind === 'radio' || kind === 'checkbox';
+        fields.push(Object.assign({
+            element: el,
+            kind: kind,
+            tag: el.tagName.toLowerCase(),
+            type: (el.getAttribute('type') || '').toLowerCase(),
+            id: el.id || '',
+            name: el.getAttribute('name') || '',
+            ariaLabel: el.getAttribute('aria-label') || '',
+            ariaLabelledby: el.getAttribute('aria-labelledby') || '',
+            automationId: el.getAttribute('data-automation-id') || '',
+            label: labelOf(el, titleText),
+            choiceLabel: choice ? choiceLabelOf(el) : '',
+            questionIndex: index,
+            questionTitle: titleText,
+            questionListPosition: listPosition,
+            selector: selectorOf(el),
+        }, stateOf(el)));
+    });
+});
+return {fingerprint: pageFingerprint(), questions: questions, fields: fields};
+"""
+
+# Re-locates a recorded page (arguments: fingerprint, field selectors, question selectors).
+# Returns null when the live page no longer matches so the caller falls back to discovery.
+SCHEMA_REPLAY_SCRIPT = DOM_HELPERS_SCRIPT + """
+if (pageFingerprint() !== arguments[0]) return null;
+const fields = [];
+for (const selector of arguments[1]) {
+    const el = document.querySelector(selector);
+    if (!el) return null;
+    fields.push(Object.assign({element: el}, stateOf(el)));
+}
+const questions = [];
+for (const selector of arguments[2]) {
+    const el = document.querySelector(selector);
+    if (!el) return null;
+    questions.push(el);
+}
+return {fields: fields, questions: questions};
+"""
+
+# Resolves once the DOM has gone arguments[0] ms without mutations (true) or arguments[1] ms pass (false)
+DOM_SETTLED_SCRIPT = """
+const done = arguments[arguments.length - 1];
+const quietMs = arguments[0];
+const timeoutMs = arguments[1];
+let quietTimer = null;
+let deadline = null;
+const observer = new MutationObserver(() => {
+    clearTimeout(quietTimer);
+    quietTimer = setTimeout(() => finish(true), quietMs);
+});
+function finish(settled) {
+    observer.disconnect();
+    clearTimeout(quietTimer);
+    clearTimeout(deadline);
+    done(settled && document.readyState === 'complete');
+}
+observer.observe(document.documentElement, {childList: true, subtree: true, attributes: true, characterData: true});
+quietTimer = setTimeout(() => finish(true), quietMs);
+deadline = setTimeout(() => finish(false), timeoutMs);
+"""
+
+# Watches for a page transition in one async roundtrip (arguments: previous fingerprint, quiet ms, timeout ms).
+# Resolves with the new fingerprint once it differs from the previous one and the DOM has gone quiet,
+# or null on timeout. An empty fingerprint (no questions, e.g. the confirmation screen) counts as a change.
+PAGE_TRANSITION_SCRIPT = DOM_HELPERS_SCRIPT + """
+const done = arguments[arguments.length - 1];
+const previous = arguments[0];
+const quietMs = arguments[1];
+const timeoutMs = arguments[2];
+let quietTimer = null;
+let deadline = null;
+const observer = new MutationObserver(check);
+function check() {
+    clearTimeout(quietTimer);
+    quietTimer = setTimeout(() => {
+        const current = pageFingerprint();
+        if (current !== previous) finish(current);
+    }, quietMs);
+}
+function finish(fingerprint) {
+    observer.disconnect();
+    clearTimeout(quietTimer);
+    clearTimeout(deadline);
+    done(fingerprint);
+}
+observer.observe(document.documentElement, {childList: true, subtree: true, attributes: true, characterData: true});
+check();
+deadline = setTimeout(() => finish(null), timeoutMs);
+"""
+
+# Scoped validation scan: looks inside question containers (plus any role="alert" banner) for visible
+# error markers and returns one {questionId, title, messages} entry per failing question.
+VALIDATION_SCAN_SCRIPT = DOM_HELPERS_SCRIPT + """
+const ERROR_TEXT = /required|invalid/;
+function ownText(el) {
+    let text = '';
+    el.childNodes.forEach(node => { if (node.nodeType === 3) text += node.nodeValue; });
+    return text;
+}
+function isError(el) {
+    return String(el.className).includes('error') || ERROR_TEXT.test(ownText(el));
+}
+const failures = [];
+function report(container, el) {
+    const message = textOf(el);
+    const questionId = container ? container.id : '';
+    let failure = failures.find(f => f.questionId === questionId);
+    if (!failure) {
+        failure = {
+            questionId: questionId,
+            title: container ? textOf(container.querySelector(TITLE_SELECTOR)) : '',
+            messages: [],
+        };
+        failures.push(failure);
+    }
+    if (message && !failure.messages.includes(message)) failure.messages.push(message);
+}
+document.querySelectorAll(QUESTION_SELECTOR).forEach(container => {
+    container.querySelectorAll('*').forEach(el => {
+        if (isError(el) && isVisible(el)) report(container, el);
+    });
+});
+document.querySelectorAll('[role="alert"]').forEach(el => {
+    if (!el.closest(QUESTION_SELECTOR) && textOf(el) && isVisible(el)) report(null, el);
+});
+return failures;
+"""
+
+# Applies a page of radio/checkbox selections in one async roundtrip (arguments: elements, kinds, timeout ms).
+# Radios are clicked through their label like a user would; resolves with one checked flag per element
+# once all of them report checked, or with the current flags when the timeout passes.
+CHOICE_APPLY_SCRIPT = DOM_HELPERS_SCRIPT + """
+const done = arguments[arguments.length - 1];
+const elements = arguments[0];
+const kinds = arguments[1];
+const deadline = Date.now() + arguments[2];
+const isChecked = el => el.getAttribute('aria-checked') === 'true' || !!el.checked;
+elements.forEach((el, i) => {
+    if (isChecked(el)) return;
+    let target = el;
+    if (kinds[i] === 'radio') {
+        const labelledby = el.getAttribute('aria-labelledby');
+        target = (labelledby && document.getElementById(labelledby.split(/\\s+/)[0])) || el.closest('label') || el;
+    }
+    target.scrollIntoView({block: 'center'});
+    target.click();
+});
+(function verify() {
+    const checked = elements.map(el => el.isConnected && isChecked(el));
+    if (checked.every(Boolean) || Date.now() >= deadline) return done(checked);
+    setTimeout(verify, 50);
+})();
+"""
+
+# Hooks fetch/XMLHttpRequest so the POST that submits the form can be captured and replayed over HTTP
+SUBMISSION_CAPTURE_SCRIPT = """
+if (!window.__formCapture) {
+    window.__formCapture = [];
+    const record = (method, url, headers, body) => {
+        if (String(method || 'GET').toUpperCase() !== 'POST' || typeof body !== 'string') return;
+        window.__formCapture.push({method: 'POST', url: new URL(url, location.href).href, headers: headers, body: body});
+    };
+    const originalFetch = window.fetch;
+    window.fetch = function(input, init) {
+        try {
+            init = init || {};
+            const headers = {};
+            new Headers(init.headers || (input && input.headers) || {}).forEach((value, key) => { headers[key] = value; });
+            record(init.method || (input && input.method), typeof input === 'string' ? input : input.url, headers, init.body);
+        } catch (e) {}
+        return originalFetch.apply(this, arguments);
+    };
+    const originalOpen = XMLHttpRequest.prototype.open;
+    const originalSetHeader = XMLHttpRequest.prototype.setRequestHeader;
+    const originalSend = XMLHttpRequest.prototype.send;
+    XMLHttpRequest.prototype.open = function(method, url) {
+        this.__capture = {method: method, url: url, headers: {}};
+        return originalOpen.apply(this, arguments);
+    };
+    XMLHttpRequest.prototype.setRequestHeader = function(key, value) {
+        if (this.__capture) this.__capture.headers[key] = value;
+        return originalSetHeader.apply(this, arguments);
+    };
+    XMLHttpRequest.prototype.send = function(body) {
+        if (this.__capture) record(this.__capture.method, this.__capture.url, this.__capture.headers, body);
+        return originalSend.apply(this, arguments);
+    };
+}
+"""
+
+CAPTURED_SUBMISSIONS_SCRIPT = """
+return window.__formCapture || [];
+"""
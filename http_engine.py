@@ -0,0 +1,207 @@
+import threading
+import datetime
+import hashlib
+import logging
+import json
+import re
+import os
+
+from seleniumForm2 import FORM_URL, FillContext, get_field_data, run_selenium_with_input
+from metrics import span
+
+# Configuration
+SUBMISSION_ENGINE = os.getenv("SUBMISSION_ENGINE", "selenium")  # "selenium" or "http"
+SUBMISSION_TEMPLATE_DIR = os.getenv("SUBMISSION_TEMPLATE_DIR", "submission_templates")
+HTTP_POOL_SIZE = int(os.getenv("HTTP_POOL_SIZE", "32"))
+HTTP_TIMEOUT = float(os.getenv("HTTP_TIMEOUT", "30"))
+TEMPLATE_VERSION = 1
+ENGINES = ("selenium", "http")
+
+# Headers that belong to the browser session rather than the payload, never replayed
+SKIPPED_HEADERS = {"cookie", "content-length", "host", "origin", "referer", "user-agent"}
+TIMESTAMP_PATTERN = re.compile(r"\d{4}-\d{2}-\d{2}T\d{2}:\d{2}:\d{2}(?:\.\d+)?Z")
+PLACEHOLDER_PATTERN = re.compile(r"\{\{(answer|timestamp)(?::([^}]*))?\}\}")
+
+_http = None
+_http_lock = threading.Lock()
+_template_lock = threading.Lock()
+
+
+def get_http():
+    # One pooled HTTP client shared by every submission in the process (urllib3 is thread-safe);
+    # urllib3 is imported on first use so the selenium-only server never loads it
+    global _http
+    with _http_lock:
+        if _http is None:
+            import urllib3
+            _http = urllib3.PoolManager(
+                num_pools=4,
+                maxsize=HTTP_POOL_SIZE,
+                block=True,
+                timeout=urllib3.Timeout(total=HTTP_TIMEOUT),
+                retries=False,
+            )
+        return _http
+
+
+class SubmissionTemplate:
+    def __init__(self, form_url, endpoint, headers, body, answers):
+        self.form_url = form_url
+        self.endpoint = endpoint
+        self.headers = headers
+        self.body = body  # raw request body with {{answer:<label>}} / {{timestamp}} placeholders
+        self.answers = answers  # label -> {"kind", "value"} as answered when the template was learned
+
+    @staticmethod
+    def path(form_url):
+        name = hashlib.sha1(form_url.encode("utf-8")).hexdigest() + ".json"
+        return os.path.join(SUBMISSION_TEMPLATE_DIR, name)
+
+    @classmethod
+    def load(cls, form_url=FORM_URL):
+        try:
+            with open(cls.path(form_url), "r", encoding="utf-8") as f:
+                data = json.load(f)
+        except FileNotFoundError:
+            return None
+        except (OSError, ValueError) as e:
+            logging.warning(f"Ignoring unreadable submission template for {form_url}: {e}")
+            return None
+        if data.get("version") != TEMPLATE_VERSION or data.get("formUrl") != form_url:
+            return None
+        return cls(form_url, data["endpoint"], data["headers"], data["body"], data["answers"])
+
+    def save(self):
+        path = self.path(self.form_url)
+        data = {
+            "version": TEMPLATE_VERSION,
+            "formUrl": self.form_url,
+            "endpoint": self.endpoint,
+            "headers": self.headers,
+            "body": self.body,
+            "answers": self.answers,
+        }
+        with _template_lock:
+            os.makedirs(SUBMISSION_TEMPLATE_DIR, exist_ok=True)
+            tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump(data, f, indent=2)
+            os.replace(tmp_path, path)
+        logging.info(f"Saved submission template for {self.form_url} -> {self.endpoint}")
+
+    @classmethod
+    def learn(cls, form_url, captured_requests, answers):
+        # Pick the captured POST that carries the most of the answers we typed, then turn those
+        # answers into placeholders so the body can be re-rendered for other applicants
+        literal_answers = {
+            label: answer for label, answer in answers.items()
+            if isinstance(answer["value"], str) and len(answer["value"]) > 1 and _is_literal(answer["value"])
+        }
+        best, best_hits = None, 0
+        for captured in captured_requests:
+            hits = sum(1 for answer in literal_answers.values() if answer["value"] in captured["body"])
+            if hits > best_hits:
+                best, best_hits = captured, hits
+        if not best:
+            logging.warning("No captured request contained the submitted answers, nothing to learn.")
+            return None
+
+        body = best["body"]
+        # Longest values first so a value that contains another is replaced whole
+        for label, answer in sorted(literal_answers.items(), key=lambda item: -len(item[1]["value"])):
+            if answer["kind"] in ("text", "date"):
+                body = body.replace(answer["value"], "{{answer:" + label.replace("}", "") + "}}")
+        body = TIMESTAMP_PATTERN.sub("{{timestamp}}", body)
+        headers = {k: v for k, v in best["headers"].items() if k.lower() not in SKIPPED_HEADERS}
+        return cls(form_url, best["url"], headers, body, answers)
+
+    def render(self, ctx):
+        def substitute(match):
+            kind, label = match.groups()
+            if kind == "timestamp":
+                return datetime.datetime.now(datetime.timezone.utc).strftime("%Y-%m-%dT%H:%M:%S.%f")[:-3] + "Z"
+            if self.answers.get(label, {}).get("kind") == "date":
+                value = ctx.random_date()
+            else:
+                value, _ = get_field_data(label, ctx)
+            # Bodies are JSON (sometimes JSON nested in a JSON string), so escape once per nesting level
+            return _escape_like(value, match.string, match.start())
+        return PLACEHOLDER_PATTERN.sub(substitute, self.body)
+
+
+def _is_literal(value):
+    return json.dumps(value)[1:-1] == value
+
+
+def _escape_like(value, body, position):
+    # A placeholder sitting inside a nested JSON string is preceded by an escaped quote (\")
+    escaped = json.dumps(value)[1:-1]
+    if body[max(0, position - 2):position] == '\\"':
+        escaped = json.dumps(escaped)[1:-1]
+    return escaped
+
+
+def send_submission(template, user_data, endpoint=None):
+    # Returns the HTTP status, or None when the request never got a response
+    ctx = FillContext.from_user_data(user_data, seed=user_data.get("seed"))
+    body = template.render(ctx)
+    http = get_http()
+    from urllib3.exceptions import HTTPError
+    try:
+        with span("http_submit"):
+            response = http.request(
+                "POST",
+                endpoint or template.endpoint,
+                body=body.encode("utf-8"),
+                headers=template.headers,
+            )
+    except HTTPError as e:
+        logging.error(f"HTTP submission failed: {e}")
+        return None
+    logging.info(f"HTTP submission answered with status {response.status}")
+    return response.status
+
+
+def submit_over_http(user_data, template=None, endpoint=None):
+    template = template or SubmissionTemplate.load()
+    if not template:
+        return False, "No captured submission template for this form yet."
+    status = send_submission(template, user_data, endpoint)
+    if status is None:
+        return False, "HTTP submission failed: no response from server."
+    if 200 <= status < 300:
+        return True, "Form submitted successfully."
+    return False, f"HTTP submission rejected with status {status}."
+
+
+def learn_submission_template(user_data, pool=None, progress=None):
+    # Runs the browser once with request capture switched on and stores the submission it made
+    ctx = FillContext.from_user_data(user_data, seed=user_data.get("seed"), pacing=user_data.get("humanPacing"))
+    ctx.capture_submission = True
+    success, message = run_selenium_with_input(user_data, pool=pool, progress=progress, ctx=ctx)
+    if success:
+        template = SubmissionTemplate.learn(FORM_URL, ctx.captured_submissions, ctx.answers)
+        if template:
+            try:
+                template.save()
+            except OSError as e:
+                logging.warning(f"Could not save submission template: {e}")
+    return success, message
+
+
+def run_submission(user_data, pool=None, progress=None):
+    # Engine comes from the request ("engine") or SUBMISSION_ENGINE; the http engine learns its
+    # template through the browser on first use and after the form stops accepting it
+    engine = user_data.get("engine") or SUBMISSION_ENGINE
+    if engine == "http":
+        template = SubmissionTemplate.load()
+        if template:
+            status = send_submission(template, user_data)
+            if status is not None and 200 <= status < 300:
+                return True, "Form submitted successfully."
+            if status is None or status >= 500:
+                # The server may or may not have taken it, so don't risk a second submission
+                return False, f"HTTP submission failed (status {status})."
+            logging.warning(f"Captured submission rejected ({status}), refreshing the template through the browser.")
+        return learn_submission_template(user_data, pool=pool, progress=progress)
+    return run_selenium_with_input(user_data, pool=pool, progress=progress)
@@ -0,0 +1,60 @@
+import subprocess
+import argparse
+import sys
+import os
+
+# Cold-start check: imports a module in a fresh interpreter with -X importtime, prints the slowest
+# imports and fails when the total exceeds the budget or a deferred heavy dependency got loaded eagerly.
+# test_import_budget.py runs it against app under pytest.
+
+IMPORT_BUDGET_MS = float(os.getenv("IMPORT_BUDGET_MS", "250"))
+# Only needed once a browser is started / pools are generated / the http engine submits
+DEFERRED_MODULES = ("selenium.webdriver", "faker", "urllib3")
+
+
+def measure(module):
+    # Returns ({module: cumulative microseconds}, [deferred modules that were loaded anyway])
+    probe = f"import sys, {module}; print(','.join(m for m in {DEFERRED_MODULES!r} if m in sys.modules))"
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", probe],
+        capture_output=True, text=True, cwd=os.path.dirname(os.path.abspath(__file__)),
+    )
+    if proc.returncode != 0:
+        raise RuntimeError(f"import {module} failed:\n{proc.stderr}")
+    cumulative = {}
+    for line in proc.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, _, timings = line.partition(":")
+        _, total, name = (part.strip() for part in timings.split("|"))
+        cumulative[name] = max(cumulative.get(name, 0), int(total))
+    loaded = [name for name in proc.stdout.strip().split(",") if name]
+    return cumulative, loaded
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Check the cold import time of the web worker.")
+    parser.add_argument("module", nargs="?", default="app", help="module to import (default: app)")
+    parser.add_argument("--budget-ms", type=float, default=IMPORT_BUDGET_MS, help="fail above this many ms")
+    parser.add_argument("--top", type=int, default=15, help="slowest imports to list")
+    args = parser.parse_args(argv)
+
+    cumulative, loaded = measure(args.module)
+    total_ms = cumulative.get(args.module, 0) / 1000
+    print(f"{'module':<40} {'cumulative ms':>14}")
+    for name, micros in sorted(cumulative.items(), key=lambda item: item[1], reverse=True)[:args.top]:
+        print(f"{name:<40} {micros / 1000:>14.1f}")
+    print(f"\nimport {args.module}: {total_ms:.1f} ms (budget {args.budget_ms:.0f} ms)")
+
+    failed = False
+    if total_ms > args.budget_ms:
+        print(f"FAIL: import time over budget by {total_ms - args.budget_ms:.1f} ms")
+        failed = True
+    if loaded:
+        print(f"FAIL: deferred modules imported eagerly: {', '.join(loaded)}")
+        failed = True
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
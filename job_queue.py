@@ -0,0 +1,133 @@
+import threading
+import logging
+import math
+import time
+import uuid
+import os
+from concurrent.futures import ThreadPoolExecutor
+
+# Configuration
+JOB_WORKERS = int(os.getenv("JOB_WORKERS", "4"))
+JOB_RESULT_TTL = float(os.getenv("JOB_RESULT_TTL", "3600"))
+JOB_MAX_PENDING = int(os.getenv("JOB_MAX_PENDING", "100"))  # queued (not yet running) jobs before rejecting
+JOB_DURATION_ESTIMATE = 60.0  # seconds per job assumed until real runs have been timed
+
+# Job States
+QUEUED = "queued"
+RUNNING = "running"
+SUCCEEDED = "succeeded"
+FAILED = "failed"
+
+
+class QueueFullError(Exception):
+    def __init__(self, retry_after):
+        super().__init__(f"Job queue is full, retry in {retry_after}s")
+        self.retry_after = retry_after
+
+
+def new_job_id():
+    return uuid.uuid4().hex
+
+
+class Job:
+    def __init__(self, payload, job_id=None):
+        self.id = job_id or new_job_id()
+        self.payload = payload
+        self.status = QUEUED
+        self.progress = {}
+        self.result = None
+        self.created_at = time.time()
+        self.started_at = None
+        self.finished_at = None
+
+    @property
+    def done(self):
+        return self.status in (SUCCEEDED, FAILED)
+
+    def to_dict(self):
+        return {
+            "jobId": self.id,
+            "status": self.status,
+            "progress": dict(self.progress),
+            "createdAt": self.created_at,
+            "startedAt": self.started_at,
+            "finishedAt": self.finished_at,
+        }
+
+
+class JobQueue:
+    def __init__(self, handler, workers=JOB_WORKERS, result_ttl=JOB_RESULT_TTL, max_pending=JOB_MAX_PENDING):
+        # handler(payload, report_progress) -> (success, message)
+        self.handler = handler
+        self.workers = workers
+        self.result_ttl = result_ttl
+        self.max_pending = max_pending
+        self._pending = 0
+        self._average_duration = JOB_DURATION_ESTIMATE
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="fill-form")
+        self._jobs = {}
+        self._lock = threading.Lock()
+
+    def submit(self, payload, job_id=None):
+        # Raises QueueFullError instead of growing the backlog without bound; job_id lets the caller
+        # record the id (e.g. in the result store) before the job exists
+        job = Job(payload, job_id)
+        with self._lock:
+            if self._pending >= self.max_pending:
+                raise QueueFullError(self._retry_after())
+            self._pending += 1
+            self._evict_expired()
+            self._jobs[job.id] = job
+        self._executor.submit(self._run, job)
+        logging.info(f"Queued job {job.id}")
+        return job
+
+    def stats(self):
+        with self._lock:
+            return {"pending": self._pending, "maxPending": self.max_pending, "workers": self.workers}
+
+    def retry_after(self):
+        with self._lock:
+            return self._retry_after()
+
+    def _retry_after(self):
+        # Rough time for the backlog ahead of a new job to drain
+        return max(1, math.ceil(self._average_duration * (self._pending + 1) / self.workers))
+
+    def get(self, job_id):
+        with self._lock:
+            return self._jobs.get(job_id)
+
+    def shutdown(self, wait=False):
+        self._executor.shutdown(wait=wait, cancel_futures=True)
+
+    def _run(self, job):
+        with self._lock:
+            self._pending -= 1
+        job.status = RUNNING
+        job.started_at = time.time()
+        logging.info(f"Running job {job.id}")
+
+        def report_progress(**progress):
+            job.progress.update(progress)
+
+        try:
+            success, message = self.handler(job.payload, report_progress)
+            job.result = {"success": success, "message": message}
+            job.status = SUCCEEDED if success else FAILED
+        except Exception as e:
+            logging.error(f"Job {job.id} crashed: {e}", exc_info=True)
+            job.result = {"success": False, "message": f"Server error: {str(e)}"}
+            job.status = FAILED
+        finally:
+            job.finished_at = time.time()
+            with self._lock:
+                # Exponential moving average of job duration, used for Retry-After estimates
+                self._average_duration += 0.2 * (job.finished_at - job.started_at - self._average_duration)
+            logging.info(f"Job {job.id} finished with status {job.status}")
+
+    def _evict_expired(self):
+        cutoff = time.time() - self.result_ttl
+        expired = [job_id for job_id, job in self._jobs.items() if job.done and job.finished_at < cutoff]
+        for job_id in expired:
+            del self._jobs[job_id]
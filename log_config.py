@@ -0,0 +1,15 @@
+import logging
+import os
+
+# Configuration
+LOG_LEVEL = os.getenv("LOG_LEVEL", "INFO")
+LOG_FORMAT = "%(asctime)s - %(levelname)s - %(message)s"
+
+
+def configure_logging(level=LOG_LEVEL):
+    # Called once by each entry point (app, CLIs); library modules only ever get loggers
+    root = logging.getLogger()
+    if getattr(root, "_form_logging_configured", False):
+        return
+    logging.basicConfig(level=level, format=LOG_FORMAT, handlers=[logging.StreamHandler()])
+    root._form_logging_configured = True
@@ -0,0 +1,139 @@
+import threading
+import logging
+import time
+from contextlib import contextmanager
+
+# Histogram buckets in seconds for phase timings, and in calls for per-run roundtrip counts
+DURATION_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120, 300)
+COUNT_BUCKETS = (10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000)
+
+
+class Histogram:
+    def __init__(self, buckets):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)  # last slot is +Inf
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value):
+        for i, bound in enumerate(self.buckets):
+            if value <= bound:
+                self.counts[i] += 1
+                break
+        else:
+            self.counts[-1] += 1
+        self.sum += value
+        self.count += 1
+
+
+class MetricsRegistry:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._histograms = {}  # (name, labels) -> Histogram
+        self._counters = {}  # (name, labels) -> float
+        self._gauges = {}  # (name, labels) -> float
+        self._help = {}
+
+    def observe(self, name, value, buckets=DURATION_BUCKETS, help_text="", **labels):
+        key = (name, tuple(sorted(labels.items())))
+        with self._lock:
+            self._help.setdefault(name, (help_text, "histogram"))
+            histogram = self._histograms.get(key)
+            if histogram is None:
+                histogram = self._histograms[key] = Histogram(buckets)
+            histogram.observe(value)
+
+    def inc(self, name, amount=1, help_text="", **labels):
+        key = (name, tuple(sorted(labels.items())))
+        with self._lock:
+            self._help.setdefault(name, (help_text, "counter"))
+            self._counters[key] = self._counters.get(key, 0) + amount
+
+    def set(self, name, value, help_text="", **labels):
+        # Gauges hold the latest value; callers refresh them right before rendering
+        key = (name, tuple(sorted(labels.items())))
+        with self._lock:
+            self._help.setdefault(name, (help_text, "gauge"))
+            self._gauges[key] = value
+
+    def render(self):
+        # Prometheus text exposition format
+        lines = []
+        with self._lock:
+            for name in sorted(self._help):
+                help_text, kind = self._help[name]
+                lines.append(f"# HELP {name} {help_text}")
+                lines.append(f"# TYPE {name} {kind}")
+                if kind in ("counter", "gauge"):
+                    values = self._counters if kind == "counter" else self._gauges
+                    for (metric, labels), value in sorted(values.items()):
+                        if metric == name:
+                            lines.append(f"{name}{_format_labels(labels)} {value}")
+                    continue
+                for (metric, labels), histogram in sorted(self._histograms.items()):
+                    if metric != name:
+                        continue
+                    cumulative = 0
+                    for bound, count in zip(histogram.buckets + ("+Inf",), histogram.counts):
+                        cumulative += count
+                        lines.append(f"{name}_bucket{_format_labels(labels + (('le', str(bound)),))} {cumulative}")
+                    lines.append(f"{name}_sum{_format_labels(labels)} {histogram.sum}")
+                    lines.append(f"{name}_count{_format_labels(labels)} {histogram.count}")
+        return "\n".join(lines) + "\n"
+
+
+def _format_labels(labels):
+    if not labels:
+        return ""
+    return "{" + ",".join(f'{key}="{value}"' for key, value in labels) + "}"
+
+
+registry = MetricsRegistry()
+
+
+# Helpers used by the automation code
+def record_phase(phase, started):
+    elapsed = time.perf_counter() - started
+    registry.observe("form_phase_seconds", elapsed, help_text="Wall-clock time per automation phase", phase=phase)
+    logging.debug(f"[timing] {phase}: {elapsed * 1000:.1f} ms")
+    return elapsed
+
+
+@contextmanager
+def span(phase):
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        record_phase(phase, started)
+
+
+def count_retry(kind):
+    registry.inc("form_retries_total", help_text="Retries by kind", kind=kind)
+
+
+def count_run(outcome):
+    registry.inc("form_runs_total", help_text="Automation runs by outcome", outcome=outcome)
+
+
+def instrument_driver(driver):
+    # Every WebDriver command (driver and element calls alike) funnels through driver.execute
+    driver.roundtrips = 0
+    execute = driver.execute
+
+    def counted_execute(driver_command, params=None):
+        driver.roundtrips += 1
+        registry.inc("webdriver_roundtrips_total", help_text="WebDriver commands sent", command=driver_command)
+        return execute(driver_command, params)
+
+    driver.execute = counted_execute
+    return driver
+
+
+def record_run_roundtrips(driver, started_roundtrips):
+    roundtrips = getattr(driver, "roundtrips", 0) - started_roundtrips
+    registry.observe(
+        "webdriver_roundtrips_per_run", roundtrips, buckets=COUNT_BUCKETS,
+        help_text="WebDriver commands per automation run",
+    )
+    return roundtrips
@@ -0,0 +1,50 @@
+import threading
+import hashlib
+import logging
+import gzip
+import os
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+
+# Configuration
+PAGE_CAPTURE = os.getenv("PAGE_CAPTURE", "0") == "1"  # opt in to saving page source for debugging
+PAGE_CAPTURE_DIR = os.getenv("PAGE_CAPTURE_DIR", "page_captures")
+SEEN_DIGESTS = 1024  # recently captured pages remembered in memory; older repeats are caught by _write
+
+# Debug snapshots are written by one background thread so a multi-MB page never blocks a submission
+_writer = ThreadPoolExecutor(max_workers=1, thread_name_prefix="page-capture")
+_seen_lock = threading.Lock()
+_seen = OrderedDict()  # digest -> None, least recently captured first
+
+
+def capture_page_source(driver, reason, enabled=None):
+    # Returns the .html.gz path the page will be written to, or None when capture is off or the
+    # identical page was captured recently (same content is stored once, whatever the reason)
+    if not (PAGE_CAPTURE if enabled is None else enabled):
+        return None
+    source = driver.page_source.encode("utf-8")
+    digest = hashlib.sha1(source).hexdigest()
+    with _seen_lock:
+        if digest in _seen:
+            _seen.move_to_end(digest)
+            return None
+        _seen[digest] = None
+        if len(_seen) > SEEN_DIGESTS:
+            _seen.popitem(last=False)
+    path = os.path.join(PAGE_CAPTURE_DIR, f"{reason}_{digest[:12]}.html.gz")
+    _writer.submit(_write, path, source)
+    return path
+
+
+def _write(path, source):
+    if os.path.exists(path):
+        return
+    try:
+        os.makedirs(PAGE_CAPTURE_DIR, exist_ok=True)
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        with gzip.open(tmp_path, "wb", compresslevel=6) as f:
+            f.write(source)
+        os.replace(tmp_path, path)
+        logging.info(f"Page source saved to {path}")
+    except OSError as e:
+        logging.warning(f"Could not save page source to {path}: {e}")
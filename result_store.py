@@ -0,0 +1,228 @@
+import threading
+import hashlib
+import atexit
+import logging
+import sqlite3
+import socket
+import json
+import time
+import uuid
+import os
+
+from job_queue import QUEUED, RUNNING, SUCCEEDED, FAILED
+
+# Configuration
+RESULT_STORE = os.getenv("RESULT_STORE", "sqlite")  # "sqlite" or "off" (no deduplication, no history)
+RESULT_STORE_PATH = os.getenv("RESULT_STORE_PATH", "results.sqlite3")
+RESULT_INFLIGHT_TTL = float(os.getenv("RESULT_INFLIGHT_TTL", "3600"))  # a queued/running claim older than this is abandoned
+RESULT_HEARTBEAT_INTERVAL = float(os.getenv("RESULT_HEARTBEAT_INTERVAL", "10"))  # seconds between liveness writes
+RESULT_OWNER_TIMEOUT = float(os.getenv("RESULT_OWNER_TIMEOUT", "60"))  # a process silent this long is gone
+RESULT_QUERY_LIMIT = 500
+
+# Identifies this process's claims among every worker sharing RESULT_STORE_PATH
+INSTANCE_ID = f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+
+# Fields that make two submissions "the same application" when the client sends no idempotency key
+DEDUP_FIELDS = ("fullName", "email", "projectTitle")
+COLUMNS = (
+    "key", "job_id", "status", "success", "message", "full_name", "email", "project_title",
+    "attempts", "created_at", "updated_at", "finished_at",
+)
+
+
+def idempotency_key(user_data, header_key=None):
+    # The Idempotency-Key header or an "idempotencyKey" field wins; otherwise a hash of the applicant's
+    # normalized name, email and project title
+    explicit = header_key or user_data.get("idempotencyKey")
+    if explicit:
+        return str(explicit)
+    identity = [str(user_data.get(field) or "").strip().lower() for field in DEDUP_FIELDS]
+    return "auto:" + hashlib.sha1(json.dumps(identity).encode("utf-8")).hexdigest()
+
+
+class SQLiteResultStore:
+    # One row per idempotency key with the outcome of its latest run. A key is "claimed" before its job
+    # is queued, so a duplicate arriving while the first run is queued, running or already succeeded
+    # gets the stored row back instead of starting another browser run. Failed runs may be retried.
+    # Every claim names the process that made it; each process writes a heartbeat, so workers sharing
+    # the database only take over claims whose owner has stopped beating.
+    def __init__(self, path=RESULT_STORE_PATH, inflight_ttl=RESULT_INFLIGHT_TTL, owner=INSTANCE_ID,
+                 heartbeat_interval=RESULT_HEARTBEAT_INTERVAL, owner_timeout=RESULT_OWNER_TIMEOUT):
+        self.path = path
+        self.inflight_ttl = inflight_ttl
+        self.owner = owner
+        self.heartbeat_interval = heartbeat_interval
+        self.owner_timeout = owner_timeout
+        self._lock = threading.Lock()
+        with self._connect() as db:
+            db.execute("PRAGMA journal_mode=WAL")
+            db.execute(
+                "CREATE TABLE IF NOT EXISTS submissions ("
+                "key TEXT PRIMARY KEY, job_id TEXT, status TEXT NOT NULL, success INTEGER, message TEXT, "
+                "full_name TEXT, email TEXT, project_title TEXT, payload TEXT NOT NULL, "
+                "attempts INTEGER NOT NULL, created_at REAL NOT NULL, updated_at REAL NOT NULL, finished_at REAL, "
+                "owner TEXT)"
+            )
+            if "owner" not in [column[1] for column in db.execute("PRAGMA table_info(submissions)")]:
+                db.execute("ALTER TABLE submissions ADD COLUMN owner TEXT")
+            db.execute("CREATE INDEX IF NOT EXISTS submissions_job_id ON submissions (job_id)")
+            db.execute("CREATE INDEX IF NOT EXISTS submissions_email ON submissions (email)")
+            db.execute("CREATE TABLE IF NOT EXISTS owners (owner TEXT PRIMARY KEY, heartbeat REAL NOT NULL)")
+        self.heartbeat()
+        self._stop = threading.Event()
+        threading.Thread(target=self._beat, name="result-store-heartbeat", daemon=True).start()
+
+    def heartbeat(self):
+        with self._lock, self._connect() as db:
+            db.execute("INSERT OR REPLACE INTO owners (owner, heartbeat) VALUES (?, ?)", (self.owner, time.time()))
+            # Owners silent for much longer than the timeout can no longer hold anything
+            db.execute("DELETE FROM owners WHERE heartbeat < ?", (time.time() - 10 * self.owner_timeout,))
+
+    def _beat(self):
+        while not self._stop.wait(self.heartbeat_interval):
+            try:
+                self.heartbeat()
+            except sqlite3.Error as e:
+                logging.warning(f"Result store heartbeat failed: {e}")
+
+    def close(self):
+        # Stops beating and drops this process's heartbeat, so other workers take its claims over at once
+        self._stop.set()
+        with self._lock, self._connect() as db:
+            db.execute("DELETE FROM owners WHERE owner = ?", (self.owner,))
+
+    def _connect(self):
+        return sqlite3.connect(self.path, timeout=30)
+
+    def claim(self, key, user_data, job_id, is_live=None):
+        # Returns the existing record when the key is taken (in flight or succeeded), else claims it
+        # for job_id and returns None. is_live(record) tells whether one of this process's in-flight
+        # records still has its job; another process's claim holds while its owner keeps beating
+        now = time.time()
+        with self._lock, self._connect() as db:
+            db.execute("BEGIN IMMEDIATE")
+            row = db.execute(
+                f"SELECT {', '.join('s.' + column for column in COLUMNS)}, s.owner, o.heartbeat "
+                "FROM submissions s LEFT JOIN owners o ON o.owner = s.owner WHERE s.key = ?",
+                (key,),
+            ).fetchone()
+            record = self._record(row) if row else None
+            if record and self._blocks_rerun(record, row[-2], row[-1], now, is_live):
+                return record
+            db.execute(
+                "INSERT OR REPLACE INTO submissions (key, job_id, status, success, message, full_name, email, "
+                "project_title, payload, attempts, created_at, updated_at, finished_at, owner) "
+                "VALUES (?, ?, ?, NULL, NULL, ?, ?, ?, ?, ?, ?, ?, NULL, ?)",
+                (
+                    key, job_id, QUEUED,
+                    user_data.get("fullName"), user_data.get("email"), user_data.get("projectTitle"),
+                    json.dumps(user_data), (record["attempts"] if record else 0) + 1,
+                    record["createdAt"] if record else now, now, self.owner,
+                ),
+            )
+        if record:
+            logging.info(f"Re-running submission {key} after a {record['status']} attempt")
+        return None
+
+    def _blocks_rerun(self, record, owner, heartbeat, now, is_live):
+        if record["status"] == SUCCEEDED:
+            return True
+        if record["status"] not in (QUEUED, RUNNING) or now - record["updatedAt"] >= self.inflight_ttl:
+            return False
+        # A claim is abandoned once its job is gone: ours when the job left our queue, another process's
+        # when that process stopped beating (it restarted, crashed or shut down mid-run)
+        if owner == self.owner:
+            return is_live is None or is_live(record)
+        return heartbeat is not None and now - heartbeat < self.owner_timeout
+
+    def release(self, key, job_id):
+        # Drops a claim whose job never got queued (the queue was full, or submitting failed), so the
+        # client can retry
+        with self._lock, self._connect() as db:
+            db.execute(
+                "DELETE FROM submissions WHERE key = ? AND job_id = ? AND status = ?", (key, job_id, QUEUED)
+            )
+
+    def mark_running(self, key):
+        with self._lock, self._connect() as db:
+            db.execute(
+                "UPDATE submissions SET status = ?, updated_at = ? WHERE key = ? AND status = ?",
+                (RUNNING, time.time(), key, QUEUED),
+            )
+
+    def finish(self, key, success, message):
+        now = time.time()
+        with self._lock, self._connect() as db:
+            db.execute(
+                "UPDATE submissions SET status = ?, success = ?, message = ?, updated_at = ?, finished_at = ? "
+                "WHERE key = ?",
+                (SUCCEEDED if success else FAILED, int(success), message, now, now, key),
+            )
+
+    def get(self, key):
+        with self._lock, self._connect() as db:
+            row = db.execute(f"SELECT {', '.join(COLUMNS)} FROM submissions WHERE key = ?", (key,)).fetchone()
+        return self._record(row) if row else None
+
+    def by_job(self, job_id):
+        with self._lock, self._connect() as db:
+            row = db.execute(f"SELECT {', '.join(COLUMNS)} FROM submissions WHERE job_id = ?", (job_id,)).fetchone()
+        return self._record(row) if row else None
+
+    def query(self, email=None, full_name=None, status=None, since=None, limit=50):
+        # Past outcomes, newest first; every filter is optional
+        clauses, params = [], []
+        for column, value in (("email", email), ("full_name", full_name), ("status", status)):
+            if value:
+                clauses.append(f"{column} = ?")
+                params.append(value)
+        if since is not None:
+            clauses.append("updated_at >= ?")
+            params.append(since)
+        where = f" WHERE {' AND '.join(clauses)}" if clauses else ""
+        params.append(max(1, min(limit, RESULT_QUERY_LIMIT)))
+        with self._lock, self._connect() as db:
+            rows = db.execute(
+                f"SELECT {', '.join(COLUMNS)} FROM submissions{where} ORDER BY updated_at DESC LIMIT ?", params
+            ).fetchall()
+        return [self._record(row) for row in rows]
+
+    @staticmethod
+    def _record(row):
+        data = dict(zip(COLUMNS, row[:len(COLUMNS)]))
+        return {
+            "key": data["key"],
+            "jobId": data["job_id"],
+            "status": data["status"],
+            "success": None if data["success"] is None else bool(data["success"]),
+            "message": data["message"],
+            "fullName": data["full_name"],
+            "email": data["email"],
+            "projectTitle": data["project_title"],
+            "attempts": data["attempts"],
+            "createdAt": data["created_at"],
+            "updatedAt": data["updated_at"],
+            "finishedAt": data["finished_at"],
+        }
+
+
+def make_result_store(kind=RESULT_STORE):
+    if kind == "sqlite":
+        return SQLiteResultStore()
+    if kind == "off":
+        return None
+    raise ValueError(f"Unknown result store: {kind}")
+
+
+_store = None
+_store_lock = threading.Lock()
+
+
+def get_result_store():
+    # Created on first use so importing this module never touches the disk
+    global _store
+    with _store_lock:
+        if _store is None and RESULT_STORE != "off":
+            _store = make_result_store()
+            atexit.register(_store.close)
+        return _store
@@ -0,0 +1,50 @@
+from selenium.common.exceptions import (
+    StaleElementReferenceException,
+    ElementClickInterceptedException,
+    WebDriverException,
+)
+import random
+import time
+import os
+
+# Configuration
+RUN_RETRIES = int(os.getenv("RUN_RETRIES", "1"))  # extra whole-run attempts after a failed run
+
+
+class RetryPolicy:
+    # Exponential backoff with jitter: attempt n waits base * multiplier**n (capped at max_delay),
+    # shortened by up to `jitter` of itself so concurrent runs don't retry in lockstep
+    def __init__(self, attempts, base_delay=0.0, max_delay=5.0, multiplier=2.0, jitter=0.5):
+        self.attempts = attempts
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.multiplier = multiplier
+        self.jitter = jitter
+
+    def delay(self, attempt):
+        delay = min(self.max_delay, self.base_delay * self.multiplier ** attempt)
+        return delay * (1 - self.jitter * random.random())
+
+    def sleep(self, attempt):
+        delay = self.delay(attempt)
+        if delay > 0:
+            time.sleep(delay)
+        return delay
+
+
+# Per-exception policies for single-field interactions. Stale elements are re-located by selector and
+# retried straight away; intercepted clicks usually mean an overlay is animating out, so back off.
+INTERACT_POLICIES = {
+    StaleElementReferenceException: RetryPolicy(attempts=3, base_delay=0.0),
+    ElementClickInterceptedException: RetryPolicy(attempts=4, base_delay=0.1, max_delay=1.0),
+}
+# Whole runs: resumed on a fresh session, fast-forwarding through the pages already completed
+RUN_POLICY = RetryPolicy(attempts=RUN_RETRIES + 1, base_delay=1.0, max_delay=15.0)
+RUN_RETRYABLE_EXCEPTIONS = (WebDriverException,)
+
+
+def policy_for(exc, policies):
+    for cls in type(exc).__mro__:
+        if cls in policies:
+            return policies[cls]
+    return None
@@ -1,8 +1,5 @@
-from selenium import webdriver
-from selenium.webdriver.common.by import By
-from selenium.webdriver.chrome.service import Service
-from selenium.webdriver.support.ui import WebDriverWait, Select
-from selenium.webdriver.support import expected_conditions as EC
+# selenium.webdriver (every browser binding, ~200 ms) is imported inside the functions that drive a
+# browser, so web workers and the HTTP engine start without it; the exceptions module is cheap
 from selenium.common.exceptions import (
     TimeoutException,
     NoSuchElementException,
@@ -10,35 +7,86 @@ from selenium.common.exceptions import (
     ElementClickInterceptedException,
     InvalidSessionIdException,
 )
-from faker import Faker
-# OTHER Libraries for Robust usage
-import asyncio
-import platform
-import uuid
-import re
 import random
+import datetime
 import time
 import logging
 import os
 from contextlib import contextmanager
 
+from form_scripts import (
+    DOM_SETTLED_SCRIPT,
+    FIELD_DISCOVERY_SCRIPT,
+    LABEL_RESOLUTION_SCRIPT,
+    PAGE_TRANSITION_SCRIPT,
+    SCHEMA_REPLAY_SCRIPT,
+    SUBMISSION_CAPTURE_SCRIPT,
+    VALIDATION_SCAN_SCRIPT,
+    CAPTURED_SUBMISSIONS_SCRIPT,
+    CHOICE_APPLY_SCRIPT,
+)
+from field_rules import classifier as field_classifier
+from checkpoint_store import checkpoint_key, get_checkpoint_store
+from answer_plan import plan_for, question_key
+from data_pools import data_pools, normalize_phone
+from form_schema import FormSchema
+from retry_policy import INTERACT_POLICIES, RUN_POLICY, RUN_RETRYABLE_EXCEPTIONS, RetryPolicy, policy_for
+from page_capture import capture_page_source
+from metrics import (
+    count_retry,
+    count_run,
+    instrument_driver,
+    record_phase,
+    record_run_roundtrips,
+    span,
+)
+
 # Configuration
 CHROMEDRIVER_PATH = os.getenv("CHROMEDRIVER_PATH", "C:\\Users\\HP\\OneDrive\\Desktop\\chromedriver.exe")
-FORM_URL = "https://forms.office.com/r/VxWggscai0"
+FORM_URL = os.getenv("FORM_URL", "https://forms.office.com/r/VxWggscai0")
 MAX_PAGES = 10
 MAX_RETRIES = 8
 DEFAULT_WAIT_TIMEOUT = 60
 FIELD_INTERACTION_DELAY = (0.2, 0.5)
-
-# Logging Setup
-logging.basicConfig(
-    level=logging.INFO,
-    format="%(asctime)s - %(levelname)s - %(message)s",
-    handlers=[logging.StreamHandler()],
-)
-
-# Faker Initialization
-fake = Faker()
+HUMAN_PACING = os.getenv("HUMAN_PACING", "0") == "1"  # opt in to random per-field delays
+DOM_SETTLE_QUIET_MS = 300
+DOM_SETTLE_TIMEOUT = 5
+CLICK_CONFIRM_TIMEOUT = 2
+PAGE_TRANSITION_TIMEOUT = 15
+STUCK_PAGE_POLICY = RetryPolicy(attempts=MAX_RETRIES, base_delay=0.25, max_delay=4.0)
+FORM_SCHEMA_CACHE = os.getenv("FORM_SCHEMA_CACHE", "1") == "1"  # replay recorded pages instead of rediscovering
+
+# Browser Profiles ("default" is a visible desktop browser, "headless" is tuned for server-side batches)
+DRIVER_PROFILE = os.getenv("DRIVER_PROFILE", "default")
+FIRST_PARTY_HOSTS = [
+    host.strip()
+    for host in os.getenv(
+        "FIRST_PARTY_HOSTS",
+        "localhost,127.0.0.1,*.office.com,*.office.net,*.microsoft.com,*.microsoftonline.com,*.msauth.net,*.msftauth.net,*.live.com",
+    ).split(",")
+    if host.strip()
+]
+BLOCKED_RESOURCE_PATTERNS = [
+    "*.woff", "*.woff2", "*.ttf", "*.otf", "*.eot",
+    "*.png", "*.jpg", "*.jpeg", "*.gif", "*.webp", "*.svg", "*.ico",
+    "*.mp4", "*.webm", "*.mp3", "*.ogg", "*.wav",
+]
+DRIVER_PROFILES = {
+    "default": {
+        "headless": False,
+        "window_size": None,
+        "page_load_strategy": "normal",
+        "block_resources": False,
+        "block_third_party": False,
+    },
+    "headless": {
+        "headless": True,
+        "window_size": (1024, 768),
+        "page_load_strategy": "eager",
+        "block_resources": True,
+        "block_third_party": True,
+    },
+}
 
 # Sample Data (IGNORE THESE.)
 sample_contacts = [
@@ -53,106 +101,219 @@ sample_texts = [
     "The project aligns with strategic organizational goals.",
 ]
 
-# Field Type Detection and Value Generation
-def get_field_data(label_text=""):
-    label = label_text.lower()
-    contact = random.choice(sample_contacts)
-
-    if "measurable impact" in label:
-        return (
-            "This project will generate measurable impact by addressing a clearly defined need within the target "
-            "community. It will implement evidence-based strategies with tracked outcomes using pre- and post-"
-            "assessments, surveys, and key performance indicators. These insights will inform continuous improvement.",
-            "long_text"
-        )
-    elif "success indicator" in label or "key success" in label:
-        return (
-            "Key success indicators include the number of individuals reached, measurable improvement in outcomes, "
-            "participant satisfaction, and timely delivery of milestones. Stakeholder engagement will also be tracked.",
-            "long_text"
+# Per-Run Fill Context (user profile + RNG, never shared between submissions)
+class FillContext:
+    def __init__(self, contacts=None, companies=None, project_titles=None, texts=None, seed=None, pacing=None):
+        self.contacts = contacts or sample_contacts
+        self.companies = companies or sample_companies
+        self.project_titles = project_titles or sample_project_titles
+        self.texts = texts or sample_texts
+        self.seed = seed
+        self.rng = random.Random(seed)
+        self.pacing = HUMAN_PACING if pacing is None else pacing
+        self.capture_submission = False
+        self.answers = {}
+        self.captured_submissions = []
+        self.completed_pages = 0  # pages navigated past; a retried run fast-forwards through them
+        self.previous_answers = {}
+        self.fast_forward = False
+        self.submit_attempted = False  # once Submit was clicked a retry could submit twice
+        self.checkpoint_store = None  # set with checkpoint_key to persist progress after every page
+        self.checkpoint_key = None
+
+    @classmethod
+    def from_user_data(cls, user_data, seed=None, pacing=None):
+        rng = random.Random(seed)
+        contact = rng.choice(sample_contacts)
+        return cls(
+            contacts=[
+                {
+                    "name": user_data.get("fullName", contact["name"]),
+                    "email": user_data.get("email", contact["email"]),
+                    "phone": user_data.get("phone") or data_pools.draw("phones", rng),
+                }
+            ],
+            companies=[user_data.get("company", rng.choice(sample_companies))],
+            project_titles=[user_data.get("projectTitle", rng.choice(sample_project_titles))],
+            seed=seed,
+            pacing=pacing,
         )
-    elif "name" in label:
-        return contact["name"], "name"
-    elif "email" in label:
-        return contact["email"], "email"
-    elif "phone" in label:
-        phone = contact.get("phone", fake.phone_number())
-        phone = re.sub(r"[^0-9\-]", "", phone)
-        phone = re.sub(r"x\d+", "", phone).strip()
-        return phone, "phone"
-    elif "organization" in label or "institution" in label or "company" in label:
-        return random.choice(sample_companies), "company"
-    elif "project title" in label:
-        return random.choice(sample_project_titles), "project_title"
-    elif "date" in label:
-        return fake.date(pattern="%Y-%m-%d"), "date"
-    else:
-        return random.choice(sample_texts), "generic"
+
+    def pause(self):
+        # Human-like pacing is opt-in; by default fields are filled back to back
+        if self.pacing and not self.fast_forward:
+            time.sleep(self.rng.uniform(*FIELD_INTERACTION_DELAY))
+
+    def record_answer(self, label, value, kind, multiple=False):
+        # Answers given during this run, keyed by field label ("text"/"date" answers get regenerated
+        # when a captured submission is replayed, "choice" answers are replayed as recorded). Radio and
+        # checkbox groups pass their question key instead: their resolved label is the option text
+        # ("Yes"), which every Yes/No question shares
+        if multiple:
+            answer = self.answers.setdefault(label, {"kind": kind, "value": []})
+            answer["value"].append(value)
+        else:
+            self.answers[label] = {"kind": kind, "value": value}
+
+    def question_rng(self, key):
+        # Seeded runs get an independent stream per question, so an answer doesn't depend on how many
+        # random draws earlier questions happened to make
+        return random.Random(f"{self.seed}|{key}") if self.seed is not None else self.rng
+
+    def recall(self, label):
+        # Answer given to this field (or choice question, see record_answer) by an earlier attempt of
+        # the same run, if any
+        return self.previous_answers.get(label, {}).get("value")
+
+    def restore_checkpoint(self):
+        checkpoint = self.checkpoint_store.load(self.checkpoint_key) if self.checkpoint_store else None
+        if checkpoint:
+            self.completed_pages = checkpoint["completedPages"]
+            self.previous_answers = checkpoint["answers"]
+        return checkpoint
+
+    def save_checkpoint(self):
+        if not self.checkpoint_store:
+            return
+        try:
+            self.checkpoint_store.save(self.checkpoint_key, {
+                "completedPages": self.completed_pages,
+                "answers": dict(self.previous_answers, **self.answers),
+            })
+        except Exception as e:
+            logging.warning(f"Could not save run checkpoint: {e}")
+
+    def clear_checkpoint(self):
+        if not self.checkpoint_store:
+            return
+        try:
+            self.checkpoint_store.delete(self.checkpoint_key)
+        except Exception as e:
+            logging.warning(f"Could not clear run checkpoint: {e}")
+
+    def begin_retry(self):
+        self.previous_answers = dict(self.previous_answers, **self.answers)
+        self.answers = {}
+        self.captured_submissions = []
+
+    def random_date(self, pattern="%Y-%m-%d"):
+        start = datetime.date(1970, 1, 1).toordinal()
+        end = datetime.date.today().toordinal()
+        return datetime.date.fromordinal(self.rng.randint(start, end)).strftime(pattern)
+
+# Field Type Detection and Value Generation (the keyword rules live in field_rules.py)
+def _contact_phone(ctx, rule):
+    phone = ctx.rng.choice(ctx.contacts).get("phone")
+    return normalize_phone(phone) if phone else data_pools.draw("phones", ctx.rng)
+
+VALUE_GENERATORS = {
+    "fixed": lambda ctx, rule: rule["value"],
+    "contact_name": lambda ctx, rule: ctx.rng.choice(ctx.contacts)["name"],
+    "contact_email": lambda ctx, rule: ctx.rng.choice(ctx.contacts)["email"],
+    "contact_phone": _contact_phone,
+    "company": lambda ctx, rule: ctx.rng.choice(ctx.companies),
+    "project_title": lambda ctx, rule: ctx.rng.choice(ctx.project_titles),
+    "date": lambda ctx, rule: ctx.random_date(rule.get("format", "%Y-%m-%d")),
+    "choice": lambda ctx, rule: ctx.rng.choice(rule["values"]),
+    "text": lambda ctx, rule: ctx.rng.choice(ctx.texts),
+}
+
+def get_field_data(label_text="", ctx=None):
+    ctx = ctx or FillContext()
+    rule = field_classifier.classify(label_text)
+    return VALUE_GENERATORS[rule["generator"]](ctx, rule), rule["field_type"]
 
 # Helper Functions
-def find_label_for_element(driver, element):
-    label_text = "Unknown Label"
+class LabelCache:
+    # Per-page label lookup keyed by WebDriver element id; start a new one for every page
+    def __init__(self):
+        self._labels = {}
+
+    def prime(self, fields):
+        for field in fields:
+            self._labels[field["element"].id] = field["label"]
+
+    def resolve(self, driver, elements):
+        missing = [e for e in elements if e.id not in self._labels]
+        if missing:
+            with span("label_resolution"):
+                resolved = driver.execute_script(LABEL_RESOLUTION_SCRIPT, missing)
+            for element, label in zip(missing, resolved):
+                if not label:
+                    logging.warning(f"Could not find label for element {element.id}")
+                self._labels[element.id] = label or "Unknown Label"
+        return [self._labels[e.id] for e in elements]
+
+def find_label_for_element(driver, element, cache=None):
     try:
-        label_ids = element.get_attribute("aria-labelledby")
-        if label_ids:
-            label_elem = driver.find_element(By.ID, label_ids.split()[0])
-            label_text = label_elem.text.strip()
-            if label_text:
-                return label_text
-
-        element_id = element.get_attribute("id")
-        if element_id:
-            label_elem = driver.find_element(By.XPATH, f"//label[@for='{element_id}']")
-            label_text = label_elem.text.strip()
-            if label_text:
-                return label_text
-
-        question_container = element.find_element(
-            By.XPATH, "./ancestor::div[contains(@data-automation-id, 'questionItem')]"
-        )
-        label_elem = question_container.find_element(
-            By.CSS_SELECTOR, "span[data-automation-id='questionTitle']"
-        )
-        label_text = label_elem.text.strip()
-        if label_text:
-            return label_text
-
-        aria_label = element.get_attribute("aria-label")
-        if aria_label:
-            label_text = aria_label.strip()
-            if label_text:
-                return label_text
-
-    except NoSuchElementException:
-        if element.get_attribute("type") == "radio":
-            try:
-                choice_label = element.find_element(
-                    By.XPATH,
-                    "./following-sibling::*//span | ./following-sibling::*//label | ./parent::span/following-sibling::span",
-                )
-                label_text = choice_label.text.strip()
-                if label_text:
-                    return f"Radio Option: {label_text}"
-            except NoSuchElementException:
-                pass
+        return (cache or LabelCache()).resolve(driver, [element])[0]
+    except StaleElementReferenceException:
+        raise
     except Exception as e:
         logging.warning(f"Label finding error: {e}")
+        return "Unknown Label"
+
+def discover_fields(driver, labels=None):
+    snapshot = driver.execute_script(FIELD_DISCOVERY_SCRIPT)
+    for field in snapshot["fields"]:
+        field["label"] = field["label"] or "Unknown Label"
+    if labels is not None:
+        labels.prime(snapshot["fields"])
+    return snapshot
+
+def replay_page(driver, page_schema, labels=None):
+    # Re-attach a recorded page to the live DOM; None means the form changed and needs discovery
+    result = driver.execute_script(
+        SCHEMA_REPLAY_SCRIPT,
+        page_schema["fingerprint"],
+        [f["selector"] for f in page_schema["fields"]],
+        [q["selector"] for q in page_schema["questions"]],
+    )
+    if not result:
+        return None
+    fields = [dict(static, **live) for static, live in zip(page_schema["fields"], result["fields"])]
+    questions = [dict(static, element=el) for static, el in zip(page_schema["questions"], result["questions"])]
+    if labels is not None:
+        labels.prime(fields)
+    return {"fingerprint": page_schema["fingerprint"], "questions": questions, "fields": fields}
+
+def collect_captured_submissions(driver, ctx):
+    if not ctx.capture_submission:
+        return
+    try:
+        ctx.captured_submissions = driver.execute_script(CAPTURED_SUBMISSIONS_SCRIPT) or []
+        logging.info(f"Captured {len(ctx.captured_submissions)} POST request(s) during submission")
+    except Exception as e:
+        logging.warning(f"Could not read captured submission requests: {e}")
 
-    logging.warning(f"Could not find label for element: {element.get_attribute('outerHTML')[:100]}...")
-    return label_text
-
-def try_interact_field(field, action, max_attempts=3):
-    for attempt in range(max_attempts):
+def try_interact_field(element, action, driver=None, selector=None, policies=INTERACT_POLICIES):
+    from selenium.webdriver.common.by import By
+    # Retries per policies (see retry_policy.py); a stale element is re-located by its snapshot selector
+    attempts = {}
+    while True:
         try:
-            action(field)
+            action(element)
             return True
-        except (StaleElementReferenceException, ElementClickInterceptedException):
-            logging.warning(f"Stale element or click intercepted on attempt {attempt+1}, retrying...")
-            time.sleep(0.5)
-    logging.error(f"Failed to interact with field after {max_attempts} attempts.")
-    return False
+        except tuple(policies) as e:
+            policy = policy_for(e, policies)
+            attempts[policy] = attempts.get(policy, 0) + 1
+            if attempts[policy] >= policy.attempts:
+                logging.error(f"Failed to interact with field after {attempts[policy]} attempts: {type(e).__name__}")
+                return False
+            count_retry("interact")
+            if isinstance(e, StaleElementReferenceException) and driver and selector:
+                try:
+                    element = driver.find_element(By.CSS_SELECTOR, selector)
+                    logging.warning("Stale element, re-located it by selector and retrying.")
+                    continue
+                except NoSuchElementException:
+                    pass
+            delay = policy.sleep(attempts[policy] - 1)
+            logging.warning(f"{type(e).__name__} on attempt {attempts[policy]}, retrying in {delay:.2f}s...")
 
 def wait_for_overlays_to_disappear(driver, wait):
+    from selenium.webdriver.common.by import By
+    from selenium.webdriver.support import expected_conditions as EC
     try:
         wait.until(
             EC.invisibility_of_element_located(
@@ -162,21 +323,141 @@ def wait_for_overlays_to_disappear(driver, wait):
     except TimeoutException:
         logging.debug("No overlays detected or they persisted.")
 
-@contextmanager
-def setup_webdriver():
+def wait_for_dom_settled(driver, quiet_ms=DOM_SETTLE_QUIET_MS, timeout=DOM_SETTLE_TIMEOUT):
+    try:
+        driver.set_script_timeout(timeout + 1)
+        settled = driver.execute_async_script(DOM_SETTLED_SCRIPT, quiet_ms, int(timeout * 1000))
+    except TimeoutException:
+        settled = False
+    if not settled:
+        logging.debug("DOM did not settle within timeout, continuing.")
+    return settled
+
+def wait_for_checked(driver, element, timeout=CLICK_CONFIRM_TIMEOUT):
+    from selenium.webdriver.support.ui import WebDriverWait
+    try:
+        WebDriverWait(driver, timeout, poll_frequency=0.05).until(
+            lambda d: element.get_attribute("aria-checked") == "true"
+        )
+        return True
+    except TimeoutException:
+        return False
+
+def choice_groups(fields):
+    # Radios/checkboxes from the page snapshot grouped by input name, in page order
+    groups = {}
+    for field in fields:
+        if field["name"]:
+            groups.setdefault(field["name"], []).append(field)
+    return groups
+
+def apply_choices(driver, fields, timeout=CLICK_CONFIRM_TIMEOUT):
+    # One roundtrip: click every radio/checkbox not yet checked and wait until all report checked.
+    # Returns one confirmed flag per field.
+    try:
+        driver.set_script_timeout(timeout + 1)
+        with span("choice_apply"):
+            return driver.execute_async_script(
+                CHOICE_APPLY_SCRIPT, [f["element"] for f in fields], [f["kind"] for f in fields], int(timeout * 1000)
+            )
+    except (TimeoutException, StaleElementReferenceException) as e:
+        logging.warning(f"Batched choice selection failed, falling back to individual clicks: {e}")
+        return [False] * len(fields)
+
+def click_choice(driver, field):
+    from selenium.webdriver.common.by import By
+    # Per-element fallback for a selection the batched pass could not confirm
+    label_id = field["ariaLabelledby"].split()[0] if field["kind"] == "radio" and field["ariaLabelledby"] else ""
+
+    clicked = []
+
+    def click(element):
+        driver.execute_script("arguments[0].scrollIntoView({block: 'center'});", element)
+        target = driver.find_element(By.ID, label_id) if label_id else element
+        driver.execute_script("arguments[0].click();", target)
+        clicked.append(element)
+
+    return try_interact_field(field["element"], click, driver, field["selector"]) and wait_for_checked(driver, clicked[-1])
+
+def wait_for_page_transition(driver, previous_fingerprint, timeout=PAGE_TRANSITION_TIMEOUT, quiet_ms=DOM_SETTLE_QUIET_MS):
+    # One async roundtrip: a MutationObserver re-fingerprints the page until it differs from the
+    # previous one and has settled. Returns True when the new page is ready.
+    try:
+        driver.set_script_timeout(timeout + 1)
+        fingerprint = driver.execute_async_script(
+            PAGE_TRANSITION_SCRIPT, previous_fingerprint, quiet_ms, int(timeout * 1000)
+        )
+    except TimeoutException:
+        fingerprint = None
+    if fingerprint is None:
+        logging.warning("No page transition detected after navigation.")
+        return False
+    return True
+
+def block_resources(driver, profile=None):
+    # Network.setBlockedURLs applies to the current tab, so attached tabs call this after switching
+    if not DRIVER_PROFILES[profile or DRIVER_PROFILE]["block_resources"]:
+        return
+    try:
+        driver.execute_cdp_cmd("Network.enable", {})
+        driver.execute_cdp_cmd("Network.setBlockedURLs", {"urls": BLOCKED_RESOURCE_PATTERNS})
+    except Exception as e:
+        logging.warning(f"Could not block resource types via CDP: {e}")
+
+def create_driver(profile=None, remote_debugging_port=None, debugger_address=None):
+    from selenium import webdriver
+    from selenium.webdriver.chrome.service import Service
+    # remote_debugging_port starts a browser other sessions can attach to; debugger_address attaches
+    # to such a browser instead of launching one (browser-level options then belong to the host)
+    profile_name = profile or DRIVER_PROFILE
+    if profile_name not in DRIVER_PROFILES:
+        raise ValueError(f"Unknown driver profile: {profile_name}")
+    settings = DRIVER_PROFILES[profile_name]
+
     service = Service(executable_path=CHROMEDRIVER_PATH)
     options = webdriver.ChromeOptions()
-    options.add_argument("--start-maximized")
+    options.page_load_strategy = settings["page_load_strategy"]
+    if debugger_address:
+        options.debugger_address = debugger_address
+        with span("driver_attach"):
+            return instrument_driver(webdriver.Chrome(service=service, options=options))
+    if remote_debugging_port:
+        options.add_argument(f"--remote-debugging-port={remote_debugging_port}")
+    if settings["headless"]:
+        options.add_argument("--headless=new")
+    else:
+        options.add_experimental_option("detach", True)
+    if settings["window_size"]:
+        options.add_argument("--window-size={},{}".format(*settings["window_size"]))
+    else:
+        options.add_argument("--start-maximized")
     options.add_argument("--disable-notifications")
     options.add_argument("--no-sandbox")
     options.add_argument("--disable-dev-shm-usage")
     options.add_argument("--disable-gpu")
     options.add_experimental_option("excludeSwitches", ["enable-automation"])
-    options.add_experimental_option("detach", True)
+    if settings["block_resources"]:
+        options.add_argument("--blink-settings=imagesEnabled=false")
+        options.add_argument("--disable-extensions")
+        options.add_argument("--mute-audio")
+        options.add_experimental_option(
+            "prefs", {"profile.managed_default_content_settings.images": 2}
+        )
+    if settings["block_third_party"]:
+        # Anything not on the form's own hosts fails DNS resolution instead of downloading
+        excludes = ", ".join(f"EXCLUDE {host}" for host in FIRST_PARTY_HOSTS)
+        options.add_argument(f"--host-resolver-rules=MAP * ~NOTFOUND, {excludes}")
 
+    with span("driver_startup"):
+        driver = instrument_driver(webdriver.Chrome(service=service, options=options))
+    block_resources(driver, profile_name)
+    return driver
+
+@contextmanager
+def setup_webdriver(profile=None):
     driver = None
     try:
-        driver = webdriver.Chrome(service=service, options=options)
+        driver = create_driver(profile)
         yield driver
     finally:
         if driver:
@@ -186,228 +467,218 @@ def setup_webdriver():
                 logging.warning(f"Error quitting driver: {e}")
 
 # Main Form Automation
-def automate_form(driver):
+def automate_form(driver, ctx=None, progress=None, schema=None, form_url=None):
+    from selenium.webdriver.common.by import By
+    from selenium.webdriver.support.ui import WebDriverWait, Select
+    from selenium.webdriver.support import expected_conditions as EC
+    ctx = ctx or FillContext()
+    form_url = form_url or FORM_URL
     wait = WebDriverWait(driver, DEFAULT_WAIT_TIMEOUT)
     page_number = 1
     total_filled = 0
-    question_counter = 0
+    question_ordinals = {}  # question key -> number across all pages, for ordinal_range answer rules
+    answer_plan = plan_for(form_url)
     navigation_retries = 0
-    previous_visible_field_ids = set()
-    previous_question_titles = set()
+    previous_fingerprint = None
+    page_settled = False  # wait_for_page_transition already waits for the new page to go quiet
     validation_error_detected = False
 
-    driver.get(FORM_URL)
+    phase_start = time.perf_counter()
+    driver.get(form_url)
     wait.until(EC.presence_of_element_located((By.TAG_NAME, "body")))
-    logging.info(f"Form page loaded: {FORM_URL}")
+    logging.info(f"Form page loaded: {form_url}")
 
     try:
         wait.until(lambda d: d.execute_script("return document.readyState") == "complete")
         logging.info("JavaScript document ready state: complete")
     except TimeoutException:
         logging.warning("Document ready state not complete within timeout")
-
-    try:
-        consent_button = WebDriverWait(driver, 5).until(
-            EC.element_to_be_clickable(
-                (
-                    By.XPATH,
-                    '//button[contains(text(), "Accept") or contains(text(), " Agree") or @data-testid="cookie-accept-button"]',
-                )
-            )
-        )
-        driver.execute_script("arguments[0].click();", consent_button)
-        logging.info("Accepted consent banner")
-        time.sleep(0.5)
-    except TimeoutException:
+    record_phase("page_load", phase_start)
+
+    phase_start = time.perf_counter()
+    # Checked once the document is complete; only an actual banner is waited on, so forms without one
+    # pay a single lookup instead of a fixed timeout
+    consent_locator = (
+        By.XPATH,
+        '//button[contains(text(), "Accept") or contains(text(), " Agree") or @data-testid="cookie-accept-button"]',
+    )
+    if driver.find_elements(*consent_locator):
+        try:
+            consent_button = WebDriverWait(driver, 5).until(EC.element_to_be_clickable(consent_locator))
+            driver.execute_script("arguments[0].click();", consent_button)
+            logging.info("Accepted consent banner")
+            try:
+                WebDriverWait(driver, 5, poll_frequency=0.1).until(EC.invisibility_of_element(consent_button))
+            except TimeoutException:
+                logging.debug("Consent banner still visible after accepting.")
+        except TimeoutException:
+            logging.warning("Consent banner found but never became clickable")
+    else:
         logging.info("No consent banner detected")
+    record_phase("consent", phase_start)
 
     while page_number <= MAX_PAGES:
         logging.info(f"--- Processing Page {page_number} ---")
-        time.sleep(1)
-
-        try:
-            question_containers = wait.until(
-                EC.visibility_of_all_elements_located(
-                    (By.XPATH, '//div[contains(@data-automation-id, "questionItem")]')
-                )
-            )
-            logging.info(f"Found {len(question_containers)} question containers")
-        except TimeoutException:
-            logging.error("Form questions not found on page")
-            return False, "Form questions not found on page"
-
-        try:
-            text_inputs = driver.find_elements(
-                By.XPATH,
-                '//input[@type="text" or @type="email" or @type="tel" or @type="number" or @type="search" or contains(@aria-label, "Text") or contains(@data-automation-id, "textInput")]',
-            )
-            text_areas = driver.find_elements(
-                By.XPATH, '//textarea | //div[@contenteditable="true"]'
-            )
-            all_text_fields = text_inputs + text_areas
-            dropdowns = driver.find_elements(
-                By.XPATH, '//select | //div[@role="combobox"] | //div[contains(@class, "dropdown")]'
-            )
-            radio_buttons = driver.find_elements(
-                By.XPATH, '//input[@type="radio"] | //div[@role="radio"]'
-            )
-            checkboxes = driver.find_elements(
-                By.XPATH, '//input[@type="checkbox"] | //div[@role="checkbox"]'
-            )
-            date_fields = driver.find_elements(
-                By.XPATH, '//input[@type="date" or @type="datetime-local" or contains(@aria-label, "Date")]'
-            )
-            fallback_inputs = driver.find_elements(
-                By.XPATH, '//input[not(@type="hidden") and not(@type="submit") and not(@type="button")]'
-            )
-            all_text_fields.extend([f for f in fallback_inputs if f not in all_text_fields])
-        except InvalidSessionIdException:
-            logging.error("Browser session lost during field detection")
-            raise
-        except Exception as e:
-            logging.error(f"Error detecting fields: {e}")
-            continue
-
-        all_fields = all_text_fields + dropdowns + radio_buttons + checkboxes + date_fields
+        ctx.fast_forward = page_number <= ctx.completed_pages
+        if ctx.fast_forward:
+            logging.info(f"Fast-forwarding through page {page_number} with answers from the previous attempt")
+        if progress:
+            progress(page=page_number, filled=total_filled)
+        if not page_settled:
+            wait_for_dom_settled(driver)
+        page_settled = False
+        if ctx.capture_submission:
+            driver.execute_script(SUBMISSION_CAPTURE_SCRIPT)
+
+        phase_start = time.perf_counter()
+        labels = LabelCache()
+        page_schema = schema.page(page_number) if schema else None
+        snapshot = replay_page(driver, page_schema, labels) if page_schema else None
+        known_navigation = page_schema["navigation"] if snapshot else None
+        if snapshot:
+            logging.info(f"Replaying cached schema for page {page_number}")
+        else:
+            if page_schema:
+                logging.info(f"Form schema mismatch on page {page_number}, rediscovering fields")
+            try:
+                # One roundtrip: wait until question containers render and snapshot every field on the page
+                snapshot = wait.until(lambda d: (s := discover_fields(d, labels))["questions"] and s)
+                logging.info(f"Found {len(snapshot['questions'])} question containers")
+            except TimeoutException:
+                logging.error("Form questions not found on page")
+                return False, "Form questions not found on page"
+            except InvalidSessionIdException:
+                logging.error("Browser session lost during field detection")
+                raise
+            if schema:
+                schema.record_page(page_number, snapshot)
+
+        record_phase("field_discovery", phase_start)
+        for question in snapshot["questions"]:
+            question_ordinals.setdefault(question_key(question), len(question_ordinals))
+
+        all_fields = snapshot["fields"]
+        all_text_fields = [f for f in all_fields if f["kind"] == "text"]
+        dropdowns = [f for f in all_fields if f["kind"] == "dropdown"]
+        radio_buttons = [f for f in all_fields if f["kind"] == "radio"]
+        checkboxes = [f for f in all_fields if f["kind"] == "checkbox"]
+        date_fields = [f for f in all_fields if f["kind"] == "date"]
         logging.info(
             f"Found {len(all_text_fields)} text fields, {len(dropdowns)} dropdowns, "
             f"{len(radio_buttons)} radios, {len(checkboxes)} checkboxes, {len(date_fields)} date fields."
         )
 
         if not all_fields:
-            logging.warning("No fields detected. Logging page source for debugging.")
-            with open(f"page_source_page_{page_number}.html", "w", encoding="utf-8") as f:
-                f.write(driver.page_source)
-            logging.info(f"Page source saved to page_source_page_{page_number}.html")
-
-        current_visible_field_ids = set()
-        current_question_titles = set()
-        for field in all_fields:
-            try:
-                if field.is_displayed() and field.is_enabled():
-                    field_id = (
-                        field.get_attribute("id")
-                        or field.get_attribute("name")
-                        or field.get_attribute("aria-labelledby")
-                        or field.get_attribute("data-automation-id")
-                        or ""
-                    )
-                    if field_id:
-                        current_visible_field_ids.add(field_id)
-            except StaleElementReferenceException:
-                continue
-
-        try:
-            for container in question_containers:
-                try:
-                    title_elem = container.find_element(
-                        By.CSS_SELECTOR, "span[data-automation-id='questionTitle']"
-                    )
-                    title_text = title_elem.text.strip()
-                    if title_text:
-                        current_question_titles.add(title_text)
-                except NoSuchElementException:
-                    continue
-        except Exception as e:
-            logging.warning(f"Error collecting question titles: {e}")
+            logging.warning("No fields detected on this page.")
+            capture_page_source(driver, f"no_fields_page_{page_number}")
 
+        # The fingerprint (question ids, titles and field counts) comes back with the snapshot, so
+        # spotting a page that did not advance costs no extra roundtrips
+        current_fingerprint = snapshot["fingerprint"]
         if (
             page_number > 1
-            and current_visible_field_ids
-            and current_visible_field_ids == previous_visible_field_ids
-            and current_question_titles == previous_question_titles
+            and current_fingerprint
+            and current_fingerprint == previous_fingerprint
             and not validation_error_detected
         ):
             logging.warning(
-                f"Possible stuck page (retry {navigation_retries+1}/{MAX_RETRIES}). "
-                f"Field IDs: {current_visible_field_ids}"
+                f"Possible stuck page (retry {navigation_retries+1}/{STUCK_PAGE_POLICY.attempts}). "
+                f"Fingerprint: {current_fingerprint}"
             )
+            STUCK_PAGE_POLICY.sleep(navigation_retries)
             try:
                 next_button = driver.find_element(
                     By.XPATH,
                     '//button[contains(@data-automation-id, "nextButton") or contains(@aria-label, "Next") or contains(text(), "Next") or contains(@class, "next")][not(@disabled)]',
                 )
                 driver.execute_script("arguments[0].scrollIntoView(true);", next_button)
-                time.sleep(0.2)
                 driver.execute_script("arguments[0].click();", next_button)
                 logging.info("Retried clicking 'Next' button to resolve stuck page.")
-                time.sleep(1)
+                page_settled = wait_for_page_transition(driver, current_fingerprint)
             except Exception as e:
                 logging.warning(f"Failed to retry 'Next' button click: {e}")
 
+            if schema:
+                # Whatever was recorded for this page number is really the previous page
+                schema.forget_page(page_number)
             navigation_retries += 1
-            if navigation_retries >= MAX_RETRIES:
+            count_retry("stuck_page")
+            if navigation_retries >= STUCK_PAGE_POLICY.attempts:
                 logging.error("Stuck on the same page after retries.")
                 return False, "Stuck on the same page after retries"
         else:
             navigation_retries = 0
-            previous_visible_field_ids = current_visible_field_ids
-            previous_question_titles = current_question_titles
+            previous_fingerprint = current_fingerprint
 
+        phase_start = time.perf_counter()
         for i, field in enumerate(all_text_fields):
+            label_text = find_label_for_element(driver, field["element"], labels)
             try:
-                if not field.is_displayed() or not field.is_enabled():
+                if not field["visible"] or not field["enabled"] or field["value"]:
                     continue
-                if field.get_attribute("value") or (field.tag_name == "div" and field.text.strip()):
-                    continue
-                label_text = find_label_for_element(driver, field)
-                data, field_type = get_field_data(label_text)
+                recalled = ctx.recall(label_text)
+                data, field_type = (recalled, "recalled") if isinstance(recalled, str) else get_field_data(label_text, ctx)
                 def fill_action(f):
-                    if f.tag_name == "div":
+                    if field["tag"] == "div":
                         driver.execute_script("arguments[0].innerText = arguments[1];", f, data)
                     else:
                         f.clear()
                         f.send_keys(data)
-                if try_interact_field(field, fill_action):
+                if try_interact_field(field["element"], fill_action, driver, field["selector"]):
                     logging.info(f"  [{field_type}] Filled '{label_text}' -> '{data[:50]}...'")
+                    ctx.record_answer(label_text, data, "text")
                     total_filled += 1
-                    question_counter += 1
-                    time.sleep(random.uniform(*FIELD_INTERACTION_DELAY))
+                    ctx.pause()
             except Exception as e:
                 logging.warning(f"Error filling text field {i+1} ('{label_text}'): {e}")
 
-        for i, dropdown in enumerate(dropdowns):
+        record_phase("fill_text", phase_start)
+
+        phase_start = time.perf_counter()
+        for i, field in enumerate(dropdowns):
+            label_text = find_label_for_element(driver, field["element"], labels)
             try:
-                if not dropdown.is_displayed() or not dropdown.is_enabled():
+                if not field["visible"] or not field["enabled"]:
                     continue
-                label_text = find_label_for_element(driver, dropdown)
-                if dropdown.tag_name == "select":
+                dropdown = field["element"]
+                if field["tag"] == "select":
                     select = Select(dropdown)
                     options = [opt for opt in select.options if opt.is_enabled() and opt.get_attribute("value")]
                     if options:
-                        random_option = random.choice(options)
+                        recalled = ctx.recall(label_text)
+                        random_option = next((o for o in options if o.text == recalled), None) or ctx.rng.choice(options)
                         select.select_by_visible_text(random_option.text)
                         logging.info(f"  Selected dropdown '{label_text}': {random_option.text}")
+                        ctx.record_answer(label_text, random_option.text, "choice")
                         total_filled += 1
-                        question_counter += 1
                     else:
                         logging.warning(f"  No valid options for dropdown '{label_text}'")
                 else:
                     driver.execute_script("arguments[0].click();", dropdown)
                     options = driver.find_elements(By.XPATH, '//div[@role="option"]')
                     if options:
-                        random.choice(options).click()
+                        recalled = ctx.recall(label_text)
+                        option = next((o for o in options if o.text.strip() == recalled), None) or ctx.rng.choice(options)
+                        option_text = option.text.strip()
+                        option.click()
                         logging.info(f"  Selected custom combobox '{label_text}'")
+                        ctx.record_answer(label_text, option_text, "choice")
                         total_filled += 1
-                        question_counter += 1
-                time.sleep(random.uniform(*FIELD_INTERACTION_DELAY))
+                ctx.pause()
             except Exception as e:
                 logging.warning(f"Error with dropdown {i+1} ('{label_text}'): {e}")
 
-        radio_groups = {}
-        for radio in radio_buttons:
-            try:
-                name = radio.get_attribute("name")
-                if name:
-                    radio_groups.setdefault(name, []).append(radio)
-            except StaleElementReferenceException:
-                continue
+        record_phase("fill_dropdown", phase_start)
 
-        for group_name, radios in radio_groups.items():
+        # Choice questions are decided first and applied together: one browser call clicks every
+        # selection on the page and confirms it registered
+        phase_start = time.perf_counter()
+        choice_plan = []
+        for group_name, radios in choice_groups(radio_buttons).items():
+            question_label = find_label_for_element(driver, radios[0]["element"], labels)
             try:
-                question_label = find_label_for_element(driver, radios[0])
                 logging.info(f"Processing radio group: '{question_label}' (name={group_name})")
-                valid_radios = [r for r in radios if r.is_displayed() and r.is_enabled()]
+                valid_radios = [r for r in radios if r["visible"] and r["enabled"]]
                 if not valid_radios:
                     logging.warning(f"No valid radios in group '{question_label}'")
                     if validation_error_detected:
@@ -416,116 +687,33 @@ def automate_form(driver):
                     else:
                         continue
 
-                if any(r.get_attribute("aria-checked") == "true" for r in valid_radios):
+                if any(r["checked"] for r in valid_radios):
                     logging.info(f"Radio group '{question_label}' already selected")
                     continue
 
-                yes_radio = None
-                no_radio = None
-                for radio in valid_radios:
-                    try:
-                        label_id = radio.get_attribute("aria-labelledby")
-                        choice_label = (
-                            driver.find_element(By.ID, label_id).text.strip().lower()
-                            if label_id
-                            else find_label_for_element(driver, radio).lower()
-                        )
-                        if "yes" in choice_label:
-                            yes_radio = radio
-                        elif "no" in choice_label:
-                            no_radio = radio
-                    except NoSuchElementException:
-                        continue
-
-                is_sixth_question = False
-                try:
-                    for radio in valid_radios:
-                        if driver.find_elements(By.XPATH, f'//*[@id="question-list"]/div[6]/div[2]/div//input[@name="{group_name}"]'):
-                            is_sixth_question = True
-                            break
-                except Exception as e:
-                    logging.warning(f"Error checking XPath for 6th question: {e}")
-
-                if is_sixth_question and yes_radio:
-                    selected_radio = yes_radio
-                    logging.info(f"Special handling: Selecting 'Yes' for 6th question radio group '{question_label}'")
-                else:
-                    if "previous funding" in question_label.lower() or question_counter in range(12, 15):
-                        logging.info(f"Handling special question: '{question_label}' (counter={question_counter})")
-                        selected_radio = yes_radio or no_radio or random.choice(valid_radios)
-                    else:
-                        selected_radio = (
-                            yes_radio
-                            if yes_radio and ("implemented" in question_label.lower() or "agree" in question_label.lower())
-                            else random.choice([yes_radio, no_radio]) if yes_radio and no_radio
-                            else random.choice(valid_radios)
-                        )
-
-                def click_radio(r):
-                    driver.execute_script("arguments[0].scrollIntoView({block: 'center'});", r)
-                    try:
-                        label_id=r.get_attribute("aria-labelledby")
-                        if label_id:
-                            label_elem = driver.find_element(By.ID, label_id)
-                            driver.execute_script("arguments[0].click();", label_elem)
-                        else:
-                            # Fallback: click on the nearest label ancestor or contanier
-                            parent_label = r.find_element(By.XPATH, "./ancestor::label")
-                            driver.execute_script("arguments[0].click();" ,parent_label)
-                    except Exception as e:
-                        logging.warning(f"Failed to click via label for radio: {e}")
-                        raise
-                    
-                    time.sleep(0.1)
-                    if r.get_attribute("aria-checked") !='true':
-                        raise Exception("Radio button click did not register")
-                if not try_interact_field(selected_radio, click_radio):
-                    try:
-                        label_id = selected_radio.get_attribute("aria-labelledby")
-                        if label_id:
-                            label_elem = driver.find_element(By.ID, label_id)
-                            driver.execute_script("arguments[0].click();", label_elem)
-                        else:
-                            parent = selected_radio.find_element(
-                                By.XPATH, "./ancestor::div[contains(@class, 'choice') or contains(@role, 'radio')]"
-                            )
-                            driver.execute_script("arguments[0].click();", parent)
-                        time.sleep(0.1)
-                        if selected_radio.get_attribute("aria-checked") != "true":
-                            logging.warning(f"Failed to select radio in group '{question_label}'")
-                            continue
-                    except Exception as e:
-                        logging.warning(f"Error clicking label/parent for radio in group '{question_label}'): {e}")
-                        continue
-
-                selected_value = selected_radio.get_attribute("value")
-                try:
-                    label_id = selected_radio.get_attribute("aria-labelledby")
-                    if label_id:
-                        selected_value = driver.find_element(By.ID, label_id).text.strip()
-                except NoSuchElementException:
-                    pass
-                logging.info(f"  Selected radio in group '{question_label}': '{selected_value}'")
-                total_filled += 1
-                question_counter += 1
-                time.sleep(random.uniform(*FIELD_INTERACTION_DELAY))
+                question = snapshot["questions"][radios[0]["questionIndex"]]
+                key = question_key(question)
+                options = [r["choiceLabel"] or r["value"] for r in valid_radios]
+                decision = answer_plan.decide(
+                    question, question_label, "radio", options,
+                    list_position=radios[0]["questionListPosition"], ordinal=question_ordinals.get(key),
+                )
+                recalled = ctx.recall(key)
+                chosen = recalled if recalled in options else decision.pick(ctx.question_rng(key))[0]
+                selected_radio = valid_radios[options.index(chosen)]
+                logging.info(f"Answer rule '{decision.rule}' chose '{chosen}' for '{question_label}'")
+                choice_plan.append({"field": selected_radio, "label": question_label, "key": key, "multiple": False})
             except Exception as e:
                 logging.error(f"Error with radio group '{group_name}' ('{question_label}'): {e}")
 
-        checkbox_groups = {}
-        for checkbox in checkboxes:
-            try:
-                name = checkbox.get_attribute("name")
-                if name:
-                    checkbox_groups.setdefault(name, []).append(checkbox)
-            except StaleElementReferenceException:
-                continue
+        record_phase("fill_radio", phase_start)
 
-        for group_name, checkboxes_in_group in checkbox_groups.items():
+        phase_start = time.perf_counter()
+        for group_name, checkboxes_in_group in choice_groups(checkboxes).items():
+            question_label = find_label_for_element(driver, checkboxes_in_group[0]["element"], labels)
             try:
-                question_label = find_label_for_element(driver, checkboxes_in_group[0])
                 logging.info(f"Processing checkbox group: '{question_label}' (name={group_name})")
-                valid_checkboxes = [cb for cb in checkboxes_in_group if cb.is_displayed() and cb.is_enabled()]
+                valid_checkboxes = [cb for cb in checkboxes_in_group if cb["visible"] and cb["enabled"]]
                 if not valid_checkboxes:
                     logging.warning(f"No valid checkboxes in group '{question_label}'")
                     if validation_error_detected:
@@ -534,99 +722,126 @@ def automate_form(driver):
                     else:
                         continue
 
+                question = snapshot["questions"][checkboxes_in_group[0]["questionIndex"]]
+                key = question_key(question)
+                recalled = ctx.recall(key) or []
+                options = [cb["choiceLabel"] or cb["value"] for cb in valid_checkboxes]
                 if validation_error_detected:
-                    selected_checkboxes = valid_checkboxes
+                    chosen = options
                     logging.info(f"Validation error detected, selecting all checkboxes in group '{question_label}'")
+                elif any(option in recalled for option in options):
+                    chosen = [option for option in options if option in recalled]
                 else:
-                    num_to_select = random.randint(1, len(valid_checkboxes))
-                    selected_checkboxes = random.sample(valid_checkboxes, num_to_select)
+                    decision = answer_plan.decide(
+                        question, question_label, "checkbox", options,
+                        list_position=checkboxes_in_group[0]["questionListPosition"], ordinal=question_ordinals.get(key),
+                    )
+                    chosen = decision.pick(ctx.question_rng(key))
+                selected_checkboxes = [cb for cb, option in zip(valid_checkboxes, options) if option in chosen]
 
                 for cb in selected_checkboxes:
-                    if cb.get_attribute("aria-checked") == "true":
-                        continue
-                    def click_checkbox(c):
-                        driver.execute_script("arguments[0].scrollIntoView({block: 'center'});", c)
-                        driver.execute_script("arguments[0].click();", c)
-                        time.sleep(0.1)
-                        if c.get_attribute("aria-checked") != "true":
-                            raise Exception("Checkbox click did not register")
-
-                    if try_interact_field(cb, click_checkbox):
-                        logging.info(f"  Selected checkbox in group '{question_label}'")
-                        total_filled += 1
-                        question_counter += 1
-                    else:
-                        logging.warning(f"Failed to select checkbox in group '{question_label}'")
-                    time.sleep(random.uniform(*FIELD_INTERACTION_DELAY))
+                    if not cb["checked"]:
+                        choice_plan.append({"field": cb, "label": question_label, "key": key, "multiple": True})
             except Exception as e:
                 logging.error(f"Error with checkbox group '{group_name}' ('{question_label}'): {e}")
 
-        for i, date_field in enumerate(date_fields):
+        record_phase("fill_checkbox", phase_start)
+
+        phase_start = time.perf_counter()
+        if choice_plan:
+            if ctx.pacing and not ctx.fast_forward:
+                confirmed = []
+                for choice in choice_plan:
+                    confirmed += apply_choices(driver, [choice["field"]])
+                    ctx.pause()
+            else:
+                confirmed = apply_choices(driver, [choice["field"] for choice in choice_plan])
+            for choice, checked in zip(choice_plan, confirmed):
+                field, question_label = choice["field"], choice["label"]
+                if not checked and not click_choice(driver, field):
+                    logging.warning(f"Failed to select {field['kind']} in group '{question_label}'")
+                    continue
+                selected_value = field["choiceLabel"] or field["value"]
+                logging.info(f"  Selected {field['kind']} in group '{question_label}': '{selected_value}'")
+                ctx.record_answer(choice["key"], selected_value, "choice", multiple=choice["multiple"])
+                total_filled += 1
+
+        record_phase("apply_choices", phase_start)
+
+        phase_start = time.perf_counter()
+        for i, field in enumerate(date_fields):
+            label_text = find_label_for_element(driver, field["element"], labels)
             try:
-                if not date_field.is_displayed() or not date_field.is_enabled() or date_field.get_attribute("value"):
+                if not field["visible"] or not field["enabled"] or field["value"]:
                     continue
-                label_text = find_label_for_element(driver, date_field)
-                date_value = fake.date(pattern="%Y-%m-%d")
+                date_value = ctx.recall(label_text) or ctx.random_date()
                 def fill_date(f):
                     f.clear()
                     f.send_keys(date_value)
-                if try_interact_field(date_field, fill_date):
+                if try_interact_field(field["element"], fill_date, driver, field["selector"]):
                     logging.info(f"  Filled date field '{label_text}': {date_value}")
+                    ctx.record_answer(label_text, date_value, "date")
                     total_filled += 1
-                    question_counter += 1
-                    time.sleep(random.uniform(*FIELD_INTERACTION_DELAY))
+                    ctx.pause()
             except Exception as e:
                 logging.warning(f"Error filling date field {i+1} ('{label_text}'): {e}")
 
+        record_phase("fill_date", phase_start)
         logging.info(f"--- Total Questions Interacted With So Far: {total_filled} ---")
 
+        phase_start = time.perf_counter()
         validation_error_detected = False
         try:
-            errors = driver.find_elements(
-                By.XPATH, '//*[contains(@class, "error") or contains(text(), "required") or contains(text(), "invalid")]'
-            )
-            for error in errors:
-                if error.is_displayed():
-                    try:
-                        error_container = error.find_element(By.XPATH, "./ancestor::div[contains(@data-automation-id, 'questionItem')]")
-                        error_label = error_container.find_element(By.CSS_SELECTOR, "span[data-automation-id='questionTitle']").text.strip()
-                        logging.error(f"Validation error for question '{error_label}': {error.text}")
-                    except NoSuchElementException:
-                        logging.error(f"Validation error detected: {error.text}")
-                    validation_error_detected = True
-                    with open(f"validation_error_page_{page_number}.html", "w", encoding="utf-8") as f:
-                        f.write(driver.page_source)
-                    logging.info(f"Page source saved to validation_error_page_{page_number}.html")
+            failures = driver.execute_script(VALIDATION_SCAN_SCRIPT)
+            for failure in failures:
+                message = "; ".join(failure["messages"])
+                if failure["title"]:
+                    logging.error(f"Validation error for question '{failure['title']}': {message}")
+                else:
+                    logging.error(f"Validation error detected: {message}")
+            if failures:
+                validation_error_detected = True
+                capture_page_source(driver, f"validation_error_page_{page_number}")
         except Exception as e:
             logging.warning(f"Error checking validation messages: {e}")
 
-        logging.info("--- Checking for Submit Button ---")
-        try:
-            submit_button = driver.find_element(
-                By.XPATH,
-                '//button[contains(@data-automation-id, "submitButton") or contains(@aria-label, "Submit") or contains(text(), "Submit")][not(@disabled)]',
-            )
-            logging.info("Submit button found, attempting to submit form.")
-            driver.execute_script("arguments[0].scrollIntoView(true);", submit_button)
-            time.sleep(0.2)
-            driver.execute_script("arguments[0].click();", submit_button)
+        record_phase("validation_scan", phase_start)
+
+        phase_start = time.perf_counter()
+        if known_navigation == "next":
+            logging.info("Cached schema continues with 'Next' on this page, skipping Submit check.")
+        else:
+            logging.info("--- Checking for Submit Button ---")
             try:
-                wait.until(
-                    EC.presence_of_element_located(
-                        (
-                            By.XPATH,
-                            '//*[contains(text(), "Your response was submitted") or contains(text(), "Thanks")]',
+                submit_button = driver.find_element(
+                    By.XPATH,
+                    '//button[contains(@data-automation-id, "submitButton") or contains(@aria-label, "Submit") or contains(text(), "Submit")][not(@disabled)]',
+                )
+                logging.info("Submit button found, attempting to submit form.")
+                driver.execute_script("arguments[0].scrollIntoView(true);", submit_button)
+                ctx.submit_attempted = True
+                driver.execute_script("arguments[0].click();", submit_button)
+                try:
+                    wait.until(
+                        EC.presence_of_element_located(
+                            (
+                                By.XPATH,
+                                '//*[contains(text(), "Your response was submitted") or contains(text(), "Thanks")]',
+                            )
                         )
                     )
-                )
-                logging.info("--- Form Submitted Successfully ---")
-                return True, "Form submitted successfully."
-            except TimeoutException:
-                logging.warning("Submission attempted but no confirmation message found, continuing.")
-        except NoSuchElementException:
-            logging.info("No Submit button found on this page, attempting Next.")
-        except Exception as e:
-            logging.error(f"Error attempting to click Submit button: {e}")
+                    logging.info("--- Form Submitted Successfully ---")
+                    record_phase("navigation", phase_start)
+                    collect_captured_submissions(driver, ctx)
+                    if schema:
+                        schema.record_navigation(page_number, "submit")
+                    return True, "Form submitted successfully."
+                except TimeoutException:
+                    logging.warning("Submission attempted but no confirmation message found, continuing.")
+            except NoSuchElementException:
+                logging.info("No Submit button found on this page, attempting Next.")
+            except Exception as e:
+                logging.error(f"Error attempting to click Submit button: {e}")
 
         logging.info("--- Attempting Navigation ---")
         wait_for_overlays_to_disappear(driver, wait)
@@ -641,16 +856,14 @@ def automate_form(driver):
                 )
             )
             driver.execute_script("arguments[0].scrollIntoView(true);", next_button)
-            time.sleep(0.2)
             driver.execute_script("arguments[0].click();", next_button)
-            wait.until(
-                lambda d: (
-                    EC.staleness_of(next_button)(d)
-                    or EC.presence_of_element_located(
-                        (By.XPATH, '//div[contains(@data-automation-id, "questionItem")]')
-                    )(d)
-                )
-            )
+            page_settled = wait_for_page_transition(driver, current_fingerprint)
+            if page_number > ctx.completed_pages:
+                ctx.completed_pages = page_number
+                ctx.save_checkpoint()
+            if schema:
+                schema.record_navigation(page_number, "next")
+            record_phase("navigation", phase_start)
             page_number += 1
             continue
 
@@ -666,7 +879,7 @@ def automate_form(driver):
                     )
                 )
                 driver.execute_script("arguments[0].scrollIntoView(true);", submit_button)
-                time.sleep(0.2)
+                ctx.submit_attempted = True
                 driver.execute_script("arguments[0].click();", submit_button)
                 wait.until(
                     EC.presence_of_element_located(
@@ -677,6 +890,10 @@ def automate_form(driver):
                     )
                 )
                 logging.info("--- Form Submitted Successfully ---")
+                record_phase("navigation", phase_start)
+                collect_captured_submissions(driver, ctx)
+                if schema:
+                    schema.record_navigation(page_number, "submit")
                 return True, "Form submitted successfully."
             except TimeoutException:
                 logging.error("Neither 'Next' nor 'Submit' found.")
@@ -696,30 +913,68 @@ def automate_form(driver):
     logging.error(f"Reached maximum pages ({MAX_PAGES}) without submitting form.")
     return False, f"Reached maximum pages ({MAX_PAGES}) without submitting form."
 
-def run_selenium_with_input(user_data):
-    global sample_contacts, sample_companies, sample_project_titles
-
-    # Update sample data with user-provided input from Form.html
-    sample_contacts = [
-        {
-            "name": user_data.get("fullName", random.choice(sample_contacts)["name"]),
-            "email": user_data.get("email", random.choice(sample_contacts)["email"]),
-            "phone": user_data.get("phone", fake.phone_number()),
-        }
-    ]
-    sample_companies = [user_data.get("company", random.choice(sample_companies))]
-    sample_project_titles = [user_data.get("projectTitle", random.choice(sample_project_titles))]
-
-    with setup_webdriver() as driver:
-        try:
-            success, message = automate_form(driver)
-            return success, message
-        except Exception as e:
-            logging.error(f"Form automation failed: {e}", exc_info=True)
-            return False, str(e)
+def run_selenium_with_input(user_data, pool=None, progress=None, ctx=None):
+    # Each submission gets its own context so concurrent runs never see each other's data
+    ctx = ctx or FillContext.from_user_data(
+        user_data, seed=user_data.get("seed"), pacing=user_data.get("humanPacing")
+    )
+
+    if ctx.checkpoint_store is None:
+        ctx.checkpoint_store = get_checkpoint_store()
+        ctx.checkpoint_key = checkpoint_key(user_data, FORM_URL)
+    if ctx.restore_checkpoint():
+        logging.info(f"Resuming from checkpoint: {ctx.completed_pages} page(s) already completed")
+
+    schema = FormSchema.load(FORM_URL) if FORM_SCHEMA_CACHE else None
+    run_start = time.perf_counter()
+    try:
+        for attempt in range(RUN_POLICY.attempts):
+            if attempt:
+                delay = RUN_POLICY.sleep(attempt - 1)
+                ctx.begin_retry()
+                count_retry("run")
+                logging.info(
+                    f"Retrying run after {delay:.1f}s (attempt {attempt + 1}/{RUN_POLICY.attempts}), "
+                    f"fast-forwarding through {ctx.completed_pages} completed page(s)"
+                )
+            # Check a warm session out of the pool when one is given, otherwise launch a fresh browser
+            session = pool.session() if pool else setup_webdriver(user_data.get("profile"))
+            try:
+                with session as driver:
+                    started_roundtrips = getattr(driver, "roundtrips", 0)
+                    try:
+                        success, message = automate_form(driver, ctx=ctx, progress=progress, schema=schema)
+                    finally:
+                        roundtrips = record_run_roundtrips(driver, started_roundtrips)
+                    logging.info(f"Run finished in {time.perf_counter() - run_start:.1f}s with {roundtrips} WebDriver roundtrips")
+            except RUN_RETRYABLE_EXCEPTIONS as e:
+                # Browser-side failures (lost session, timeouts, stale pages) are worth another attempt
+                logging.error(f"Form automation attempt {attempt + 1} failed: {e}", exc_info=True)
+                success, message = False, str(e)
+                outcome = "error"
+            else:
+                outcome = "success" if success else "failure"
+            if success or ctx.submit_attempted:
+                ctx.clear_checkpoint()
+                break
+        count_run(outcome)
+        return success, message
+    except Exception as e:
+        logging.error(f"Form automation failed: {e}", exc_info=True)
+        count_run("error")
+        return False, str(e)
+    finally:
+        record_phase("run_total", run_start)
+        if schema:
+            try:
+                schema.save()
+            except OSError as e:
+                logging.warning(f"Could not save form schema: {e}")
 
 # Example usage
 if __name__ == "__main__":
+    from log_config import configure_logging
+    configure_logging()
     user_data = {
         "fullName": "Alice Johnson",
         "email": "alice.johnson@example.com",
@@ -0,0 +1,6 @@
+import import_budget
+
+
+def test_app_import_within_budget():
+    # Fails when importing the web worker gets slower than IMPORT_BUDGET_MS or loads a deferred module
+    assert import_budget.main(["app", "--top", "5"]) == 0